@@ -0,0 +1,143 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+from pymongo import ReturnDocument
+from app.core.config import settings
+from app.database.connection import get_database
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketBackend(ABC):
+    """Storage for token buckets; consume() must be atomic per key"""
+
+    @abstractmethod
+    def consume(self, key: str, capacity: float, refill_per_second: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take cost tokens from a bucket. Returns (allowed, seconds until allowed)"""
+        raise NotImplementedError
+
+
+class InMemoryTokenBucketBackend(TokenBucketBackend):
+    """Per-process buckets in a dict; O(1) per call with periodic compaction"""
+
+    def __init__(self, compact_interval: float = 60.0):
+        self._buckets: Dict[str, List[float]] = {}  # key -> [tokens, last_refill, capacity, refill_per_second]
+        self._lock = threading.Lock()
+        self._compact_interval = compact_interval
+        self._next_compaction = time.monotonic() + compact_interval
+
+    def consume(self, key: str, capacity: float, refill_per_second: float, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_compaction:
+                self._compact(now)
+
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [capacity, now, capacity, refill_per_second]
+            else:
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * refill_per_second)
+                bucket[1] = now
+
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return True, 0.0
+            return False, (cost - bucket[0]) / refill_per_second
+
+    def _compact(self, now: float):
+        """Drop buckets that have refilled completely; they behave like new ones"""
+        full = [
+            key for key, (tokens, last_refill, capacity, rate) in self._buckets.items()
+            if tokens + (now - last_refill) * rate >= capacity
+        ]
+        for key in full:
+            del self._buckets[key]
+        self._next_compaction = now + self._compact_interval
+
+
+class MongoTokenBucketBackend(TokenBucketBackend):
+    """Buckets shared by all workers, updated atomically with a pipeline update.
+
+    Idle buckets are removed by a TTL index once they would be full again.
+    """
+
+    def __init__(self):
+        self.collection = None
+
+    def _get_collection(self):
+        if self.collection is None:
+            self.collection = get_database().rate_limits
+            self.collection.create_index("expires_at", expireAfterSeconds=0)
+        return self.collection
+
+    def consume(self, key: str, capacity: float, refill_per_second: float, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.time()
+        refilled = {
+            "$min": [
+                capacity,
+                {"$add": [
+                    {"$ifNull": ["$tokens", capacity]},
+                    {"$multiply": [{"$subtract": [now, {"$ifNull": ["$last_refill", now]}]}, refill_per_second]}
+                ]}
+            ]
+        }
+        bucket = self._get_collection().find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "last_refill": now}},
+                {"$set": {"allowed": {"$gte": ["$tokens", cost]}}},
+                {"$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", cost]}, "$tokens"]},
+                    "expires_at": {"$toDate": {"$multiply": [now + capacity / refill_per_second, 1000]}}
+                }}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        if bucket["allowed"]:
+            return True, 0.0
+        return False, (cost - bucket["tokens"]) / refill_per_second
+
+
+class LoginRateLimiter:
+    """Per-IP and per-email token buckets checked before any password hashing"""
+
+    def __init__(self, backend: Optional[TokenBucketBackend] = None):
+        self.backend = backend
+
+    def _get_backend(self) -> TokenBucketBackend:
+        if self.backend is None:
+            if settings.rate_limit_backend == "mongo":
+                self.backend = MongoTokenBucketBackend()
+            else:
+                self.backend = InMemoryTokenBucketBackend()
+        return self.backend
+
+    def check(self, client_ip: str, email: str) -> Optional[float]:
+        """Return None if the attempt may proceed, else seconds to wait"""
+        backend = self._get_backend()
+        try:
+            allowed, retry_after = backend.consume(
+                f"login:ip:{client_ip}",
+                settings.login_ip_burst,
+                settings.login_ip_per_minute / 60
+            )
+            if not allowed:
+                return retry_after
+
+            allowed, retry_after = backend.consume(
+                f"login:email:{email.strip().lower()}",
+                settings.login_email_burst,
+                settings.login_email_per_minute / 60
+            )
+            return None if allowed else retry_after
+        except Exception as e:
+            # A broken shared store must not lock everyone out
+            logger.error(f"Login rate limiter unavailable: {e}")
+            return None
+
+
+# Singleton instance
+login_rate_limiter = LoginRateLimiter()
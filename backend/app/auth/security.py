@@ -1,10 +1,16 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import queue_depth
 from app.models.user import TokenData
 import logging
 
@@ -15,9 +21,20 @@ pwd_context = CryptContext(
     bcrypt__rounds=12
 )
 
+# bcrypt is pure CPU (~250ms at 12 rounds) and releases the GIL, so it runs in
+# a dedicated pool whose size caps how many cores logins can take at once
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="password-hash"
+)
+queue_depth.set_function(password_executor._work_queue.qsize, queue="password_hash")
+
 # JWT token security
 security = HTTPBearer()
 
+# Verified tokens keyed by SHA-256 digest; entries never outlive the token's exp
+token_cache = TTLCache(maxsize=settings.token_cache_size, ttl=settings.token_cache_ttl)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -41,6 +58,39 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a replacement hash if the stored one is outdated.
+
+    Returns (valid, new_hash). new_hash is set when the password is valid but
+    stored with a deprecated scheme, outdated rounds, or as a werkzeug hash.
+    """
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except Exception as e:
+        logging.debug(f"Passlib verification failed: {e}")
+
+        # Fallback: werkzeug hashes are verified once, then replaced
+        try:
+            from werkzeug.security import check_password_hash
+            if check_password_hash(hashed_password, plain_password):
+                return True, pwd_context.hash(plain_password)
+        except Exception as e2:
+            logging.debug(f"Werkzeug verification failed: {e2}")
+        return False, None
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, verify_and_update_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -61,6 +111,11 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security))
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+    token_digest = hashlib.sha256(credentials.credentials.encode()).digest()
+    token_data = token_cache.get(token_digest)
+    if token_data is not None:
+        return token_data
     
     try:
         payload = jwt.decode(
@@ -74,5 +129,9 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security))
         token_data = TokenData(user_id=user_id)
     except JWTError:
         raise credentials_exception
+
+    expires_in = payload["exp"] - time.time() if "exp" in payload else settings.token_cache_ttl
+    if expires_in > 0:
+        token_cache.set(token_digest, token_data, ttl=min(expires_in, settings.token_cache_ttl))
     
     return token_data
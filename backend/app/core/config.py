@@ -11,10 +11,63 @@ class Settings(BaseSettings):
     jwt_secret_key: str = "your-super-secret-jwt-key-change-this-in-production"
     jwt_algorithm: str = "HS256"
     jwt_access_token_expire_minutes: int = 1440  # 24 hours
+    password_hash_workers: int = 4  # max concurrent bcrypt hash/verify operations
+    token_cache_size: int = 10000  # verified JWTs kept in memory
+    token_cache_ttl: int = 300  # seconds; never longer than the token's own expiry
+    user_cache_ttl: int = 30  # seconds a user profile is served from memory
+
+    # Login throttling (token buckets checked before password verification)
+    rate_limit_backend: str = "memory"  # "memory" (per worker) or "mongo" (shared)
+    login_ip_burst: int = 20
+    login_ip_per_minute: float = 10
+    login_email_burst: int = 5
+    login_email_per_minute: float = 2
     
     # Groq AI
     groq_api_key: Optional[str] = None
-    
+
+    # Search
+    search_enhancement_timeout: float = 0.5  # seconds to wait for AI query enhancement
+    search_enhancement_cache_ttl: int = 3600  # seconds
+    search_enhancement_cache_size: int = 1024
+    vector_index_enabled: bool = True  # keep task embeddings in memory for search
+    semantic_scan_batch_size: int = 512  # vectors scored per batch when no index is resident
+    duplicate_similarity_threshold: float = 0.85
+    tag_stats_cache_ttl: int = 30  # seconds a worker reuses its tag statistics snapshot
+
+    # Logging
+    log_format: str = "text"  # "text" or "json" (one JSON object per line)
+    access_log_sample_rate: float = 1.0  # fraction of fast 2xx/3xx requests written to the access log
+    access_log_slow_threshold: float = 1.0  # seconds; slower requests and errors are always logged
+    log_queue_size: int = 10000  # records buffered for the background writer
+    log_queue_overflow: str = "drop"  # "drop" (shed DEBUG/INFO when full) or "block"
+    log_queue_block_timeout: float = 0.5  # seconds WARNING+ records wait for room
+    log_retention_days: int = 7
+    log_max_total_mb: int = 10240  # disk budget for all log files; 0 disables
+    log_compress_rotated: bool = True  # gzip each day's files after midnight
+    log_compress_delay: float = 60.0  # seconds after rollover before compressing
+    log_search_workers: int = 4  # threads scanning log files in parallel for /api/logs/search
+    log_search_max_days: int = 31  # widest date range one search may cover
+    log_stream_buffer: int = 1000  # lines queued per live-stream client before its lines are dropped
+
+    # Metrics
+    metrics_enabled: bool = True  # serve Prometheus metrics at /metrics
+    metrics_multiprocess_dir: Optional[str] = None  # shared directory to aggregate metrics across workers
+    metrics_flush_interval: float = 5.0  # seconds between snapshots written to metrics_multiprocess_dir
+
+    # Service method instrumentation (recent calls kept in memory for /api/debug/perf)
+    perf_instrumentation_enabled: bool = True
+    perf_buffer_size: int = 10000  # most recent calls kept; older ones are overwritten
+    perf_slow_threshold: float = 0.5  # seconds; slower calls are listed as slow
+
+    # Profiling (the middleware is only installed when enabled)
+    profiling_enabled: bool = False
+    profiling_admin_user_ids: list = []  # users whose X-Profile header is honoured
+    profiling_sample_every: int = 0  # also profile every Nth request; 0 disables sampling
+    profiling_mode: str = "cprofile"  # "cprofile" (.pstats) or "sampling" (.collapsed flamegraph stacks)
+    profiling_sample_interval: float = 0.005  # seconds between stack samples in sampling mode
+    profiling_max_files: int = 200  # oldest profiles beyond this are deleted
+
     # FastAPI
     app_name: str = "Task Management API"
     debug: bool = True
@@ -0,0 +1,200 @@
+import json
+import math
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from app.core.log_index import text_sample_rate, update_sidecar
+
+LATENCY_INDEX_VERSION = 3
+BASE_BUCKET_MINUTES = 5  # resolution of the cached partials; report buckets are multiples of it
+RELATIVE_ACCURACY = 0.01  # percentiles are within 1% of the true latency
+MIN_LATENCY = 1e-6  # seconds; anything faster counts as zero
+
+TEXT_ACCESS_PATTERN = re.compile(
+    rb"^\d{4}-\d{2}-\d{2} (\d{2}):(\d{2}):\d{2} - (\S+) (\S+) - Status: (\d{3}) - Time: ([\d.]+)s"
+)
+JSON_TIME_PATTERN = re.compile(r"T(\d{2}):(\d{2})")
+ID_SEGMENT_PATTERN = re.compile(r"^(?:[0-9a-fA-F]{24}|\d+|[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12})$")
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+class LatencySketch:
+    """Mergeable quantile sketch with relative error guarantees (DDSketch).
+
+    Values fall into logarithmic bins, so memory grows with the latency
+    range rather than the number of requests, and two sketches merge by
+    adding their bin counts. Wraps a plain dict, so it is stored in JSON
+    sidecars as is.
+    """
+
+    def __init__(self, data: Optional[dict] = None):
+        self.data = data if data is not None else {"zero": 0.0, "bins": {}}
+
+    def add(self, value: float, weight: float = 1.0):
+        if value <= MIN_LATENCY:
+            self.data["zero"] += weight
+            return
+        key = str(math.ceil(math.log(value) / _LOG_GAMMA))
+        bins = self.data["bins"]
+        bins[key] = bins.get(key, 0.0) + weight
+
+    def merge(self, other: "LatencySketch"):
+        self.data["zero"] += other.data["zero"]
+        bins = self.data["bins"]
+        for key, count in other.data["bins"].items():
+            bins[key] = bins.get(key, 0.0) + count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated q-quantile (0..1) in seconds; None when empty"""
+        total = self.data["zero"] + sum(self.data["bins"].values())
+        if total == 0:
+            return None
+        rank = q * total
+        cumulative = self.data["zero"]
+        if cumulative > rank:
+            return 0.0
+        key = None
+        for key in sorted(self.data["bins"], key=int):
+            cumulative += self.data["bins"][key]
+            if cumulative > rank:
+                break
+        # Midpoint of the bin, which is within RELATIVE_ACCURACY of every value in it
+        return 2 * _GAMMA ** int(key) / (_GAMMA + 1)
+
+
+def normalize_route(url: str) -> str:
+    """Path of a request URL with id-like segments replaced by {id}"""
+    path = urlsplit(url).path or "/"
+    return "/".join("{id}" if ID_SEGMENT_PATTERN.match(segment) else segment for segment in path.split("/"))
+
+
+def parse_access_line(line: bytes) -> Optional[Tuple[int, str, int, float, float]]:
+    """(minute of day, "METHOD route", status, seconds, weight) of an access log line"""
+    if line.startswith(b"{"):
+        try:
+            entry = json.loads(line)
+            match = JSON_TIME_PATTERN.search(entry["time"])
+            # Keyed by URL like text lines, not by the route template, so a
+            # route reads the same in both formats and unmatched paths stay apart
+            request = (f"{entry['method']} {normalize_route(entry['url'])}", int(entry["status_code"]), float(entry["response_time"]))
+            weight = 1 / (entry.get("sample_rate") or 1)
+        except (ValueError, KeyError, TypeError):
+            return None
+        if match is None:
+            return None
+        hour, minute = match.groups()
+    else:
+        match = TEXT_ACCESS_PATTERN.match(line)
+        if match is None:
+            return None
+        hour, minute, method, url, status_code, seconds = (group.decode("utf-8", errors="replace") for group in match.groups())
+        request = (f"{method} {normalize_route(url)}", int(status_code), float(seconds))
+        # Fast successes may be sampled while errors and slow requests never are
+        weight = 1 / text_sample_rate(line)
+    return (int(hour) * 60 + int(minute), *request, weight)
+
+
+def _empty_latency_index() -> dict:
+    return {
+        "version": LATENCY_INDEX_VERSION,
+        "offset": 0,
+        "lines": 0,
+        # base bucket start (minute of day) -> route -> count, errors, client_errors, sketch
+        "buckets": {}
+    }
+
+
+def _count_request(index: dict, line_number: int, offset: int, line: bytes):
+    parsed = parse_access_line(line)
+    if parsed is None:
+        return
+    minute, route, status_code, seconds, weight = parsed
+    bucket = str(minute - minute % BASE_BUCKET_MINUTES)
+    routes = index["buckets"].setdefault(bucket, {})
+    stats = routes.get(route)
+    if stats is None:
+        stats = routes[route] = {"count": 0.0, "errors": 0.0, "client_errors": 0.0, "sketch": LatencySketch().data}
+    stats["count"] += weight
+    if status_code >= 500:
+        stats["errors"] += weight
+    elif status_code >= 400:
+        stats["client_errors"] += weight
+    LatencySketch(stats["sketch"]).add(seconds, weight)
+
+
+def update_latency_index(log_file: Path) -> dict:
+    """Per-route partials of an access log file, updated from the last scanned offset"""
+    return update_sidecar(log_file, "latency", _empty_latency_index, _count_request)
+
+
+class _RouteTotals:
+    __slots__ = ("count", "errors", "client_errors", "sketch")
+
+    def __init__(self):
+        self.count = 0.0
+        self.errors = 0.0
+        self.client_errors = 0.0
+        self.sketch = LatencySketch()
+
+    def add(self, stats: dict):
+        self.count += stats["count"]
+        self.errors += stats["errors"]
+        self.client_errors += stats["client_errors"]
+        self.sketch.merge(LatencySketch(stats["sketch"]))
+
+    def summary(self, route: str) -> dict:
+        def percentile(q: float) -> Optional[float]:
+            value = self.sketch.quantile(q)
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "route": route,
+            "count": round(self.count),
+            "error_rate": round(self.errors / self.count, 4) if self.count else 0.0,
+            "client_error_rate": round(self.client_errors / self.count, 4) if self.count else 0.0,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99)
+        }
+
+
+def _summaries(routes: Dict[str, _RouteTotals]) -> List[dict]:
+    return [totals.summary(route) for route, totals in sorted(routes.items(), key=lambda item: -item[1].count)]
+
+
+def latency_report(files: List[Tuple[str, Path]], bucket_minutes: int, route_filter: Optional[str] = None) -> dict:
+    """Request counts, error rates and percentiles per route, overall and per time bucket.
+
+    files are (YYYY-MM-DD, access log path) pairs; the cached partials of each
+    are brought up to date first, so only lines written since the last report
+    are parsed. Counts are estimates scaled up by the access log sample rate.
+    """
+    needle = route_filter.lower() if route_filter else None
+    overall: Dict[str, _RouteTotals] = {}
+    buckets: Dict[datetime, Dict[str, _RouteTotals]] = {}
+
+    for date, log_file in files:
+        day = datetime.strptime(date, "%Y-%m-%d")
+        index = update_latency_index(log_file)
+        for base_minute, routes in index["buckets"].items():
+            minute = int(base_minute)
+            start = day + timedelta(minutes=minute - minute % bucket_minutes)
+            bucket = buckets.setdefault(start, {})
+            for route, stats in routes.items():
+                if needle is not None and needle not in route.lower():
+                    continue
+                bucket.setdefault(route, _RouteTotals()).add(stats)
+                overall.setdefault(route, _RouteTotals()).add(stats)
+
+    return {
+        "bucket_minutes": bucket_minutes,
+        "routes": _summaries(overall),
+        "buckets": [
+            {"start": start.isoformat(), "routes": _summaries(routes)}
+            for start, routes in sorted(buckets.items()) if routes
+        ]
+    }
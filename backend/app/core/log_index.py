@@ -0,0 +1,182 @@
+import gzip
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from app.core.logging_config import parse_log_file_name, parse_log_line
+
+LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
+TEXT_LEVEL_PATTERN = re.compile(rb" - (DEBUG|INFO|WARNING|ERROR|CRITICAL) - ")
+TEXT_STATUS_PATTERN = re.compile(rb" - Status: (\d{3}) - ")
+TEXT_SAMPLE_PATTERN = re.compile(rb" - Sample: ([0-9.eE+-]+)")
+
+INDEX_DIR_NAME = ".index"
+INDEX_VERSION = 2
+CHECKPOINT_STRIDE = 1000  # lines between entries of the sparse offset table
+
+# One lock per sidecar, so a long first scan of one file holds up no other
+_sidecar_locks: Dict[Path, threading.Lock] = {}
+_sidecar_locks_guard = threading.Lock()
+
+
+def index_path(log_file: Path, kind: Optional[str] = None) -> Optional[Path]:
+    """Sidecar location; shared by a day's .log and its later .log.gz"""
+    parsed = parse_log_file_name(log_file)
+    if parsed is None:
+        return None
+    log_type, date = parsed
+    suffix = f".{kind}.json" if kind else ".json"
+    return log_file.parent / INDEX_DIR_NAME / f"{log_type}-{date.strftime('%Y-%m-%d')}{suffix}"
+
+
+def _empty_index() -> dict:
+    return {
+        "version": INDEX_VERSION,
+        "offset": 0,  # uncompressed bytes scanned, always at a line boundary
+        "lines": 0,
+        "levels": dict.fromkeys(LEVELS, 0),
+        "status_classes": {},
+        "estimated_requests": 0.0,
+        "stride": CHECKPOINT_STRIDE,
+        "checkpoints": [0]  # checkpoints[i] is the offset of line i * stride
+    }
+
+
+def _load(path: Path, empty: Callable[[], dict]) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == empty()["version"]:
+            return index
+    except (OSError, ValueError):
+        pass
+    return empty()
+
+
+def _save(path: Path, index: dict):
+    path.parent.mkdir(exist_ok=True)
+    # Per process, so workers updating the same sidecar never share a temp file
+    temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(temp, path)
+
+
+def _count_line(index: dict, line_number: int, offset: int, line: bytes):
+    """Add one line's level and access status to the running totals"""
+    if line_number % index["stride"] == 0 and line_number // index["stride"] == len(index["checkpoints"]):
+        index["checkpoints"].append(offset)
+
+    entry = parse_log_line(line.decode("utf-8", errors="replace")) if line.startswith(b"{") else None
+    if entry is not None:
+        level = entry.get("level")
+        status_code = entry.get("status_code")
+        weight = 1 / (entry.get("sample_rate") or 1)
+    else:
+        match = TEXT_LEVEL_PATTERN.search(line)
+        level = match.group(1).decode() if match else None
+        match = TEXT_STATUS_PATTERN.search(line)
+        status_code = int(match.group(1)) if match else None
+        weight = 1 / text_sample_rate(line)
+
+    if level in index["levels"]:
+        index["levels"][level] += 1
+    if isinstance(status_code, int):
+        status_class = f"{status_code // 100}xx"
+        index["status_classes"][status_class] = index["status_classes"].get(status_class, 0) + weight
+        index["estimated_requests"] += weight
+
+
+def text_sample_rate(line: bytes) -> float:
+    """Sample rate written into a text access line; 1 when it has none"""
+    match = TEXT_SAMPLE_PATTERN.search(line)
+    try:
+        rate = float(match.group(1)) if match else 1.0
+    except ValueError:
+        return 1.0
+    return rate if rate > 0 else 1.0
+
+
+def update_sidecar(log_file: Path, kind: Optional[str], empty: Callable[[], dict],
+                   count_line: Callable[[dict, int, int, bytes], None]) -> dict:
+    """Bring one of a log file's sidecars up to date and return it.
+
+    empty() creates a fresh sidecar holding at least version, offset and
+    lines; count_line(index, line number, byte offset, line) folds one line
+    into it. Only bytes after the last scanned offset are read; a trailing
+    line still being written is left for the next update. A file that
+    shrank (recreated) is rescanned from the start.
+    """
+    sidecar = index_path(log_file, kind)
+    if sidecar is None:
+        raise ValueError(f"Not a log file: {log_file.name}")
+
+    with _sidecar_locks_guard:
+        lock = _sidecar_locks.setdefault(sidecar, threading.Lock())
+
+    with lock:
+        index = _load(sidecar, empty)
+        compressed = log_file.name.endswith(".gz")
+        if compressed and index.get("complete"):
+            # Compressed days never change; seeking in gzip would decompress
+            return index
+        if not compressed and log_file.stat().st_size < index["offset"]:
+            index = empty()
+
+        opener = gzip.open if compressed else open
+        changed = False
+        with opener(log_file, "rb") as f:
+            f.seek(index["offset"])
+            offset = index["offset"]
+            lines = index["lines"]
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                count_line(index, lines, offset, line)
+                offset += len(line)
+                lines += 1
+                changed = True
+
+        if changed or compressed:
+            index["offset"] = offset
+            index["lines"] = lines
+            index["complete"] = compressed
+            _save(sidecar, index)
+        return index
+
+
+def update_index(log_file: Path) -> dict:
+    """Line, level and status counts plus the sparse line offset table of a log file"""
+    return update_sidecar(log_file, None, _empty_index, _count_line)
+
+
+def line_offset(log_file: Path, line_number: int) -> Optional[int]:
+    """Byte offset of a 0-based line: one seek to the nearest checkpoint, then at most stride lines"""
+    index = update_index(log_file)
+    if line_number >= index["lines"]:
+        return None
+
+    checkpoint = line_number // index["stride"]
+    offset = index["checkpoints"][checkpoint]
+    opener = gzip.open if log_file.name.endswith(".gz") else open
+    with opener(log_file, "rb") as f:
+        f.seek(offset)
+        for _ in range(line_number - checkpoint * index["stride"]):
+            offset += len(f.readline())
+    return offset
+
+
+def prune_indexes(log_dir: Path):
+    """Delete sidecars whose log file has been removed"""
+    index_dir = log_dir / INDEX_DIR_NAME
+    if not index_dir.exists():
+        return
+    for sidecar in index_dir.iterdir():
+        # type-date.json, type-date.<kind>.json, or a temp file left by either
+        stem = sidecar.name.split(".")[0]
+        if not (log_dir / f"{stem}.log").exists() and not (log_dir / f"{stem}.log.gz").exists():
+            sidecar.unlink(missing_ok=True)
+            with _sidecar_locks_guard:
+                _sidecar_locks.pop(sidecar, None)
@@ -0,0 +1,132 @@
+import gzip
+from collections import deque
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+BLOCK_SIZE = 64 * 1024
+
+
+def _open_binary(path: Path) -> BinaryIO:
+    if path.name.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def iter_lines_forward(f: BinaryIO, start: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """Yield (byte offset, line) from start to the end of the file"""
+    f.seek(start)
+    offset = start
+    for line in f:
+        yield offset, line.rstrip(b'\n')
+        offset += len(line)
+
+
+def iter_lines_reverse(f: BinaryIO, end: int, block_size: int = BLOCK_SIZE) -> Iterator[Tuple[int, bytes]]:
+    """Yield (byte offset, line) backwards from end, reading fixed-size blocks.
+
+    Only the current block and one partial line are held in memory.
+    """
+    position = end
+    remainder = b''
+    at_end = True
+    while position > 0:
+        read_size = min(block_size, position)
+        position -= read_size
+        f.seek(position)
+        pieces = (f.read(read_size) + remainder).split(b'\n')
+
+        if at_end:
+            # end sits right after a newline: nothing follows the last piece
+            if pieces[-1] == b'':
+                pieces.pop()
+            at_end = False
+
+        # The first piece may continue in the previous block
+        remainder = pieces[0]
+        offset = position + len(remainder) + 1
+        offsets = []
+        for piece in pieces[1:]:
+            offsets.append(offset)
+            offset += len(piece) + 1
+        for line_offset, piece in zip(reversed(offsets), reversed(pieces[1:])):
+            yield line_offset, piece
+
+    if remainder:
+        yield 0, remainder
+
+
+def _matches(line: bytes, needle: Optional[str]) -> bool:
+    return needle is None or needle in _decode(line).lower()
+
+
+def _decode(line: bytes) -> str:
+    # Lines keep a Windows \r so that offsets stay exact
+    return line.decode('utf-8', errors='replace').rstrip('\r')
+
+
+def read_log_page(
+    path: Path,
+    lines: int = 100,
+    search: Optional[str] = None,
+    before: Optional[int] = None,
+    after: Optional[int] = None
+) -> dict:
+    """One page of a log file, addressed by byte offset cursors.
+
+    Without after, returns the last `lines` (matching) lines ending before
+    the `before` offset (default: end of file). With
+    after, returns the next `lines` (matching) lines starting at that offset.
+    Scans stop as soon as the page is full, and memory is bounded by the
+    page size. Offsets are in uncompressed bytes, also for .gz files, which
+    can only be read forwards.
+    """
+    needle = search.lower() if search else None
+    compressed = path.name.endswith('.gz')
+    page: List[Tuple[int, bytes]] = []
+    has_more = False
+    # Where an empty page sits
+    empty_offset = after if after is not None else before or 0
+
+    with _open_binary(path) as f:
+        if after is not None:
+            for offset, line in iter_lines_forward(f, after):
+                if not _matches(line, needle):
+                    continue
+                if len(page) == lines:
+                    has_more = True
+                    break
+                page.append((offset, line))
+            more_before, more_after = after > 0, has_more
+        elif compressed:
+            # No backwards seeking in gzip: stream forwards keeping the last page
+            window = deque(maxlen=lines + 1)
+            for offset, line in iter_lines_forward(f):
+                if before is not None and offset >= before:
+                    break
+                if _matches(line, needle):
+                    window.append((offset, line))
+            has_more = len(window) > lines
+            page = list(window)[-lines:] if lines else []
+            more_before, more_after = has_more, before is not None
+        else:
+            size = f.seek(0, 2)
+            end = empty_offset = size if before is None else min(before, size)
+            for offset, line in iter_lines_reverse(f, end):
+                if not _matches(line, needle):
+                    continue
+                if len(page) == lines:
+                    has_more = True
+                    break
+                page.append((offset, line))
+            page.reverse()
+            more_before, more_after = has_more, end < size
+
+    start_offset = page[0][0] if page else empty_offset
+    end_offset = page[-1][0] + len(page[-1][1]) + 1 if page else start_offset
+    return {
+        "lines": [_decode(line) for _, line in page],
+        "start_offset": start_offset,
+        "end_offset": end_offset,
+        "has_more_before": more_before,
+        "has_more_after": more_after
+    }
@@ -0,0 +1,140 @@
+import gzip
+import mmap
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Pattern, Tuple
+from app.core.config import settings
+from app.core.metrics import queue_depth
+
+# Text lines start with "2024-01-15 10:30:00", JSON lines with {"time": "2024-01-15T10:30:00.123"
+TIMESTAMP_PATTERN = re.compile(rb'(?:\{"time": ")?(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2})')
+
+# Scans one file per thread: gzip decompression and mmap page faults release the GIL
+log_search_executor = ThreadPoolExecutor(max_workers=settings.log_search_workers, thread_name_prefix="log-search")
+queue_depth.set_function(log_search_executor._work_queue.qsize, queue="log_search")
+
+
+def compile_pattern(pattern: str, regex: bool = False, case_sensitive: bool = False) -> Pattern[bytes]:
+    """Bytes pattern for a literal or regex search; raises re.error for bad regexes"""
+    source = pattern.encode("utf-8")
+    if not regex:
+        source = re.escape(source)
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    return re.compile(source, flags)
+
+
+def format_bound(moment) -> Optional[bytes]:
+    """A datetime as the comparable timestamp prefix of a log line"""
+    return moment.strftime("%Y-%m-%d %H:%M:%S").encode() if moment else None
+
+
+def _line_time(line: bytes) -> Optional[bytes]:
+    match = TIMESTAMP_PATTERN.match(line)
+    return match.group(1) + b" " + match.group(2) if match else None
+
+
+def _line_start(mm: mmap.mmap, position: int) -> int:
+    """Start of the first line beginning at or after position"""
+    if position == 0:
+        return 0
+    newline = mm.find(b"\n", position - 1)
+    return len(mm) if newline == -1 else newline + 1
+
+
+def _next_stamped(mm: mmap.mmap, position: int) -> Tuple[int, Optional[bytes]]:
+    """Start and timestamp of the first timestamped line at or after a line start.
+
+    Skips continuation lines such as tracebacks, which belong to the
+    record before them.
+    """
+    size = len(mm)
+    while position < size:
+        end = mm.find(b"\n", position)
+        end = size if end == -1 else end
+        stamp = _line_time(mm[position:min(end, position + 64)])
+        if stamp is not None:
+            return position, stamp
+        position = end + 1
+    return size, None
+
+
+def _bisect_time(mm: mmap.mmap, bound: bytes, inclusive: bool) -> int:
+    """Offset of the first record stamped after bound (or at it, if not inclusive).
+
+    Log files are written in time order, so a binary search over byte
+    positions finds a time window in O(log size) reads.
+    """
+    low, high = 0, len(mm)
+    while low < high:
+        middle = (low + high) // 2
+        _, stamp = _next_stamped(mm, _line_start(mm, middle))
+        if stamp is None or stamp > bound or (stamp == bound and not inclusive):
+            high = middle
+        else:
+            low = middle + 1
+    return _next_stamped(mm, _line_start(mm, low))[0]
+
+
+def _search_plain(path: Path, pattern: Pattern[bytes], since: Optional[bytes], until: Optional[bytes],
+                  limit: int) -> Tuple[List[Tuple[int, str]], bool]:
+    matches = []
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return matches, False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = _bisect_time(mm, since, inclusive=False) if since else 0
+            end = _bisect_time(mm, until, inclusive=True) if until else len(mm)
+            # The regex runs over the mapped window directly; only matching lines are copied
+            position = start
+            while position < end:
+                match = pattern.search(mm, position, end)
+                if match is None:
+                    break
+                if len(matches) == limit:
+                    return matches, True
+                line_start = mm.rfind(b"\n", 0, match.start()) + 1
+                line_end = mm.find(b"\n", match.start(), end)
+                line_end = end if line_end == -1 else line_end
+                matches.append((line_start, _decode(mm[line_start:line_end])))
+                position = line_end + 1
+    return matches, False
+
+
+def _search_compressed(path: Path, pattern: Pattern[bytes], since: Optional[bytes], until: Optional[bytes],
+                       limit: int) -> Tuple[List[Tuple[int, str]], bool]:
+    matches = []
+    offset = 0
+    stamp = None
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            line_offset = offset
+            offset += len(line)
+            # Continuation lines take the timestamp of the record they belong to
+            stamp = _line_time(line) or stamp
+            if since and (stamp is None or stamp < since):
+                continue
+            if until and stamp is not None and stamp > until:
+                break
+            if pattern.search(line) is None:
+                continue
+            if len(matches) == limit:
+                return matches, True
+            matches.append((line_offset, _decode(line.rstrip(b"\n"))))
+    return matches, False
+
+
+def _decode(line: bytes) -> str:
+    return line.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def search_file(path: Path, pattern: Pattern[bytes], since: Optional[bytes] = None,
+                until: Optional[bytes] = None, limit: int = 1000) -> Tuple[List[Tuple[int, str]], bool]:
+    """Matching (byte offset, line) pairs of one log file, and whether limit cut them off.
+
+    since/until are bounds from format_bound. Plain files are memory-mapped
+    and the time window is found by binary search; .gz files are streamed.
+    """
+    if path.name.endswith(".gz"):
+        return _search_compressed(path, pattern, since, until, limit)
+    return _search_plain(path, pattern, since, until, limit)
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+
+class LogSubscription:
+    """One live viewer of a log type, fed on its event loop"""
+
+    def __init__(self, log_type: str, min_level: int, search: Optional[str], buffer_size: int):
+        self.log_type = log_type
+        self.min_level = min_level
+        self.search = search.lower() if search else None
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = 0
+
+    def matches(self, levelno: int, line: str) -> bool:
+        return levelno >= self.min_level and (self.search is None or self.search in line.lower())
+
+    def put(self, line: str):
+        try:
+            self.queue.put_nowait(line)
+        except asyncio.QueueFull:
+            # A slow client loses lines instead of holding up the others
+            self.dropped += 1
+
+    def take_dropped(self) -> int:
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class LogStreamHub:
+    """Fans formatted log lines out to live viewers.
+
+    Lines are published by the file handlers on the log listener thread,
+    right after they are written, so a line is formatted once however many
+    clients watch, and nobody polls files. Each event loop gets one
+    thread-safe callback per line, which then fills its subscribers' queues.
+    """
+
+    def __init__(self):
+        # Replaced, never mutated, so the listener thread reads without locking
+        self._subscribers: Dict[str, Tuple[LogSubscription, ...]] = {}
+        self._lock = threading.Lock()
+
+    def has_subscribers(self, log_type: str) -> bool:
+        return bool(self._subscribers.get(log_type))
+
+    def subscribe(self, log_type: str, min_level: int = logging.NOTSET, search: Optional[str] = None,
+                  buffer_size: int = 1000) -> LogSubscription:
+        subscription = LogSubscription(log_type, min_level, search, buffer_size)
+        with self._lock:
+            self._subscribers[log_type] = self._subscribers.get(log_type, ()) + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: LogSubscription):
+        with self._lock:
+            remaining = tuple(s for s in self._subscribers.get(subscription.log_type, ()) if s is not subscription)
+            self._subscribers[subscription.log_type] = remaining
+
+    def publish(self, log_type: str, levelno: int, line: str):
+        """Called from the listener thread for every written line"""
+        subscribers = self._subscribers.get(log_type)
+        if not subscribers:
+            return
+        for loop in {subscription.loop for subscription in subscribers}:
+            try:
+                loop.call_soon_threadsafe(self._deliver, loop, log_type, levelno, line)
+            except RuntimeError:
+                # Loop already closed; its subscriptions die with it
+                continue
+
+    def _deliver(self, loop: asyncio.AbstractEventLoop, log_type: str, levelno: int, line: str):
+        for subscription in self._subscribers.get(log_type, ()):
+            if subscription.loop is loop and subscription.matches(levelno, line):
+                subscription.put(line)
+
+
+# Singleton instance
+log_stream_hub = LogStreamHub()
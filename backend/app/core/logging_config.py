@@ -1,21 +1,277 @@
 import logging
 import logging.handlers
 import os
+import copy
+import gzip
+import json
+import queue
+import random
+import shutil
+import threading
+import time
 from datetime import datetime, timedelta
 import glob
 from pathlib import Path
+from typing import Dict, List, Optional
 from app.core.config import settings
+from app.core.metrics import log_records_dropped, queue_depth
+from app.core.log_stream import log_stream_hub
+
+LOG_TYPES = ['app', 'error', 'access', 'database', 'auth']
+COMPRESS_LOCK_STALE_AFTER = 3600  # seconds before another worker may take over a compression lock
+
+
+class LogQueueStats:
+    """Counters for the shared log queue"""
+
+    def __init__(self):
+        self.enqueued = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def as_dict(self, log_queue: "queue.Queue") -> dict:
+        return {
+            "depth": log_queue.qsize(),
+            "capacity": log_queue.maxsize,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped
+        }
+
+
+_exception_formatter = logging.Formatter()
+
+
+def _render_lazy(value, rendered: Dict[int, str]) -> str:
+    """str() of a lazy message argument or field, computed once per record"""
+    key = id(value)
+    if key not in rendered:
+        render = getattr(value, "render", None)
+        rendered[key] = render(lambda part: _render_arg(part, rendered)) if render else str(value)
+    return rendered[key]
+
+
+def _render_arg(value, rendered: Dict[int, str]):
+    """A message argument with lazy objects replaced by their rendering"""
+    if value is None or isinstance(value, (str, int, float, bool, dict, list, tuple, set)):
+        return value
+    return _render_lazy(value, rendered)
+
+
+def _snapshot_field(value, rendered: Dict[int, str]):
+    """A field value as it is now: containers are copied, lazy objects rendered"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (dict, list, tuple, set)):
+        return copy.deepcopy(value)
+    return _render_lazy(value, rendered)
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the background listener without touching disk.
+
+    When the queue is full, records below WARNING are dropped at once;
+    WARNING and above wait up to log_queue_block_timeout before being
+    dropped, unless the overflow policy is "block", which always waits.
+    """
+
+    def __init__(self, log_queue: "queue.Queue", target: str, stats: LogQueueStats):
+        super().__init__(log_queue)
+        self.target = target
+        self.stats = stats
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        # Render now: callers may change a logged dict after the call returns,
+        # and the listener thread must not read it concurrently. Each lazy
+        # object is rendered once, whether it is used by the message, the
+        # fields, or both.
+        rendered: Dict[int, str] = {}
+        if isinstance(record.args, tuple):
+            record.args = tuple(_render_arg(arg, rendered) for arg in record.args)
+        record.msg = record.getMessage()
+        record.args = None
+        fields = getattr(record, "fields", None)
+        if fields and settings.log_format == "json":
+            record.fields = {name: _snapshot_field(value, rendered) for name, value in fields.items()}
+        else:
+            # Only JsonFormatter writes fields
+            record.fields = None
+        if record.exc_info:
+            # Tracebacks are rendered now, while their frames still exist
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        record.log_target = self.target
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if settings.log_queue_overflow == "block":
+                self.queue.put(record)
+            elif record.levelno >= logging.WARNING:
+                try:
+                    self.queue.put(record, timeout=settings.log_queue_block_timeout)
+                except queue.Full:
+                    self.stats.dropped += 1
+                    log_records_dropped.inc()
+                    return
+            else:
+                self.stats.dropped += 1
+                log_records_dropped.inc()
+                return
+
+        self.stats.enqueued += 1
+        depth = self.queue.qsize()
+        if depth > self.stats.max_depth:
+            self.stats.max_depth = depth
+
+
+class DispatchHandler(logging.Handler):
+    """Routes dequeued records to the file handlers of the logger that emitted them"""
+
+    def __init__(self, targets: Dict[str, List[logging.Handler]]):
+        super().__init__()
+        self.targets = targets
+
+    def handle(self, record: logging.LogRecord):
+        for handler in self.targets.get(getattr(record, "log_target", "root"), ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def flush(self):
+        for handlers in self.targets.values():
+            for handler in handlers:
+                handler.flush()
+
+    def close(self):
+        for handlers in self.targets.values():
+            for handler in handlers:
+                handler.close()
+        super().close()
+
+
+class LogQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose stop sentinel waits for room in a full queue"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: standard record attributes plus record.fields.
+
+    Fields arrive already snapshotted by BoundedQueueHandler.prepare; they
+    are serialized to JSON here, on the listener thread.
+    """
+
+    def __init__(self, include_location: bool = True):
+        super().__init__()
+        self.include_location = include_location
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        if self.include_location:
+            entry["location"] = f"{record.filename}:{record.lineno}"
+            entry["function"] = record.funcName
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def parse_log_line(line: str) -> Optional[dict]:
+    """Decode a JSON log line; None for text-format lines"""
+    if not line.startswith('{'):
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+class DailyFileHandler(logging.FileHandler):
+    """Writes to <log_type>-YYYY-MM-DD.log and moves to the next day's file at midnight.
+
+    The finished file is handed to background maintenance for compression
+    and retention, so the writer thread only pays for a reopen.
+    """
+
+    def __init__(self, log_dir: Path, log_type: str):
+        self.log_dir = log_dir
+        self.log_type = log_type
+        self.current_date = datetime.now().strftime('%Y-%m-%d')
+        self.next_rollover = self._next_midnight()
+        super().__init__(self._path_for(self.current_date), encoding='utf-8')
+
+    def _path_for(self, date: str) -> Path:
+        return self.log_dir / f"{self.log_type}-{date}.log"
+
+    def _next_midnight(self) -> float:
+        tomorrow = (datetime.now() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return tomorrow.timestamp()
+
+    def emit(self, record: logging.LogRecord):
+        if time.time() >= self.next_rollover:
+            self.rollover()
+        super().emit(record)
+        if log_stream_hub.has_subscribers(self.log_type):
+            # Formatted again only while someone watches /api/logs/stream
+            try:
+                log_stream_hub.publish(self.log_type, record.levelno, self.format(record))
+            except Exception:
+                self.handleError(record)
+
+    def rollover(self):
+        """Close today's file; the next emit opens the new date's file"""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        self.current_date = datetime.now().strftime('%Y-%m-%d')
+        self.baseFilename = os.path.abspath(self._path_for(self.current_date))
+        self.next_rollover = self._next_midnight()
+
+        # Give other workers writing the same file time to roll over too
+        timer = threading.Timer(settings.log_compress_delay, maintain_log_dir, args=(self.log_dir,))
+        timer.daemon = True
+        timer.start()
+
+
+_log_queue: "queue.Queue" = queue.Queue(maxsize=settings.log_queue_size)
+_log_queue_stats = LogQueueStats()
+queue_depth.set_function(_log_queue.qsize, queue="log")
+_log_listener: LogQueueListener = None
 
 
 def setup_logging():
-    """Setup logging configuration with daily rotation and cleanup"""
+    """Setup logging configuration with daily rotation and cleanup.
+
+    File and console handlers run on a background QueueListener thread;
+    loggers only enqueue records, so request handling never waits on disk.
+    """
+    global _log_listener
+
+    # Drain and stop a listener from a previous setup
+    shutdown_logging()
     
     # Create logs directory if it doesn't exist
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
     
-    # Clean up old log files (keep only last 7 days)
-    cleanup_old_logs(log_dir)
+    # Compress finished files and enforce retention off the startup path
+    threading.Thread(target=maintain_log_dir, args=(log_dir,), name="log-maintenance", daemon=True).start()
     
     # Create formatters
     detailed_formatter = logging.Formatter(
@@ -27,9 +283,16 @@ def setup_logging():
         '%(asctime)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    
-    # Get current date for log file naming
-    current_date = datetime.now().strftime('%Y-%m-%d')
+
+    access_formatter = logging.Formatter(
+        '%(asctime)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    # Structured mode: every log file holds JSON lines (the console stays readable)
+    if settings.log_format == "json":
+        detailed_formatter = JsonFormatter()
+        access_formatter = JsonFormatter(include_location=False)
     
     # Setup root logger
     root_logger = logging.getLogger()
@@ -42,98 +305,215 @@ def setup_logging():
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(simple_formatter)
-    root_logger.addHandler(console_handler)
     
     # Main application log file (daily rotation)
-    app_log_file = log_dir / f"app-{current_date}.log"
-    app_file_handler = logging.FileHandler(app_log_file, encoding='utf-8')
+    app_file_handler = DailyFileHandler(log_dir, 'app')
     app_file_handler.setLevel(logging.DEBUG if settings.debug else logging.INFO)
     app_file_handler.setFormatter(detailed_formatter)
-    root_logger.addHandler(app_file_handler)
     
     # Error log file (daily rotation)
-    error_log_file = log_dir / f"error-{current_date}.log"
-    error_file_handler = logging.FileHandler(error_log_file, encoding='utf-8')
+    error_file_handler = DailyFileHandler(log_dir, 'error')
     error_file_handler.setLevel(logging.ERROR)
     error_file_handler.setFormatter(detailed_formatter)
-    root_logger.addHandler(error_file_handler)
     
     # Access log file for API requests (daily rotation)
-    access_log_file = log_dir / f"access-{current_date}.log"
-    access_file_handler = logging.FileHandler(access_log_file, encoding='utf-8')
+    access_file_handler = DailyFileHandler(log_dir, 'access')
     access_file_handler.setLevel(logging.INFO)
-    access_file_handler.setFormatter(logging.Formatter(
-        '%(asctime)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    ))
+    access_file_handler.setFormatter(access_formatter)
     
     # Create access logger
     access_logger = logging.getLogger("access")
     access_logger.setLevel(logging.INFO)
-    access_logger.addHandler(access_file_handler)
     access_logger.propagate = False
     
     # Database operations log
-    db_log_file = log_dir / f"database-{current_date}.log"
-    db_file_handler = logging.FileHandler(db_log_file, encoding='utf-8')
+    db_file_handler = DailyFileHandler(log_dir, 'database')
     db_file_handler.setLevel(logging.INFO)
     db_file_handler.setFormatter(detailed_formatter)
     
     # Create database logger
     db_logger = logging.getLogger("database")
     db_logger.setLevel(logging.INFO)
-    db_logger.addHandler(db_file_handler)
     db_logger.propagate = False
     
     # Authentication log
-    auth_log_file = log_dir / f"auth-{current_date}.log"
-    auth_file_handler = logging.FileHandler(auth_log_file, encoding='utf-8')
+    auth_file_handler = DailyFileHandler(log_dir, 'auth')
     auth_file_handler.setLevel(logging.INFO)
     auth_file_handler.setFormatter(detailed_formatter)
     
     # Create auth logger
     auth_logger = logging.getLogger("auth")
     auth_logger.setLevel(logging.INFO)
-    auth_logger.addHandler(auth_file_handler)
     auth_logger.propagate = False
+
+    # Every logger only enqueues; one background thread writes all files
+    targets = {
+        "root": [console_handler, app_file_handler, error_file_handler],
+        "access": [access_file_handler],
+        "database": [db_file_handler],
+        "auth": [auth_file_handler]
+    }
+    for name, logger in (("root", root_logger), ("access", access_logger),
+                         ("database", db_logger), ("auth", auth_logger)):
+        logger.handlers.clear()
+        logger.addHandler(BoundedQueueHandler(_log_queue, name, _log_queue_stats))
+
+    _log_listener = LogQueueListener(_log_queue, DispatchHandler(targets))
+    _log_listener.start()
     
     logging.info(f"Logging setup complete. Log files created in: {log_dir.absolute()}")
     logging.info(f"Debug mode: {settings.debug}")
 
 
-def cleanup_old_logs(log_dir: Path, days_to_keep: int = 7):
-    """Remove log files older than specified days"""
+def shutdown_logging():
+    """Flush every queued record to disk and stop the background listener"""
+    global _log_listener
+    if _log_listener is None:
+        return
+
+    listener, _log_listener = _log_listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.flush()
+        handler.close()
+
+
+def get_log_queue_stats() -> dict:
+    """Depth, capacity and drop counters of the log queue"""
+    return _log_queue_stats.as_dict(_log_queue)
+
+
+def parse_log_file_name(file_path: Path) -> Optional[tuple]:
+    """Return (log_type, date) for type-YYYY-MM-DD.log[.gz], or None"""
+    name = file_path.name
+    for suffix in ('.log.gz', '.log'):
+        if name.endswith(suffix):
+            stem = name[:-len(suffix)]
+            break
+    else:
+        return None
+
+    log_type, _, date_part = stem.partition('-')
+    try:
+        return log_type, datetime.strptime(date_part, '%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def find_log_file(log_dir: Path, log_type: str, date: str) -> Optional[Path]:
+    """Locate a day's log file, whether still plain or already compressed"""
+    for suffix in ('.log', '.log.gz'):
+        path = log_dir / f"{log_type}-{date}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def compress_log_file(path: Path):
+    """Gzip a finished log file next to itself and remove the original.
+
+    Every worker runs maintenance, so a lock file created with O_EXCL
+    makes sure only one of them compresses a given file; the others skip it.
+    """
+    target = path.with_name(path.name + '.gz')
+    temp = path.with_name(f"{path.name}.gz.{os.getpid()}.tmp")
+    lock = path.with_name(path.name + '.gz.lock')
+    try:
+        fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            if time.time() - lock.stat().st_mtime < COMPRESS_LOCK_STALE_AFTER:
+                return
+            # Left behind by a worker that died mid-compression
+            lock.unlink()
+        except FileNotFoundError:
+            pass
+        return
+    os.close(fd)
+
+    try:
+        with open(path, 'rb') as source, gzip.open(temp, 'wb', compresslevel=6) as destination:
+            shutil.copyfileobj(source, destination, 1024 * 1024)
+        os.replace(temp, target)
+        path.unlink()
+        logging.info(f"Compressed log file: {path.name}")
+    except FileNotFoundError:
+        # Another worker got there first
+        temp.unlink(missing_ok=True)
+    except Exception:
+        temp.unlink(missing_ok=True)
+        raise
+    finally:
+        lock.unlink(missing_ok=True)
+
+
+_maintenance_lock = threading.Lock()
+
+
+def maintain_log_dir(log_dir: Path):
+    """Compress log files from previous days, then apply retention"""
+    with _maintenance_lock:
+        try:
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            cutoff_date = datetime.now() - timedelta(days=settings.log_retention_days)
+            if settings.log_compress_rotated:
+                for path in sorted(log_dir.glob('*.log')):
+                    parsed = parse_log_file_name(path)
+                    # Files past retention are about to be deleted anyway
+                    if parsed and cutoff_date <= parsed[1] < today:
+                        compress_log_file(path)
+
+            cleanup_old_logs(log_dir, settings.log_retention_days, settings.log_max_total_mb * 1024 * 1024)
+        except Exception as e:
+            logging.error(f"Error during log maintenance: {e}")
+
+
+def cleanup_old_logs(log_dir: Path, days_to_keep: int = 7, max_total_bytes: Optional[int] = None):
+    """Remove log files older than specified days, then the oldest files over the disk budget"""
     try:
         cutoff_date = datetime.now() - timedelta(days=days_to_keep)
-        cutoff_date_str = cutoff_date.strftime('%Y-%m-%d')
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         
-        # Find all log files
-        log_patterns = ['app-*.log', 'error-*.log', 'access-*.log', 'database-*.log', 'auth-*.log']
+        # Find all log files, plain or compressed
+        log_files = []
+        for log_type in LOG_TYPES:
+            for pattern in (f'{log_type}-*.log', f'{log_type}-*.log.gz'):
+                log_files.extend(Path(log_file) for log_file in glob.glob(str(log_dir / pattern)))
         
         deleted_count = 0
-        for pattern in log_patterns:
-            log_files = glob.glob(str(log_dir / pattern))
-            
-            for log_file in log_files:
-                file_path = Path(log_file)
-                # Extract date from filename (format: type-YYYY-MM-DD.log)
-                try:
-                    filename = file_path.stem
-                    date_part = filename.split('-', 1)[1]  # Get everything after first dash
-                    file_date = datetime.strptime(date_part, '%Y-%m-%d')
-                    
-                    if file_date < cutoff_date:
-                        file_path.unlink()
-                        deleted_count += 1
-                        logging.info(f"Deleted old log file: {file_path.name}")
-                        
-                except (ValueError, IndexError) as e:
-                    # Skip files that don't match expected format
-                    logging.warning(f"Skipping file with unexpected format: {file_path.name}")
-                    continue
+        remaining = []
+        for file_path in log_files:
+            # Extract date from filename (format: type-YYYY-MM-DD.log[.gz])
+            parsed = parse_log_file_name(file_path)
+            if parsed is None:
+                # Skip files that don't match expected format
+                logging.warning(f"Skipping file with unexpected format: {file_path.name}")
+                continue
+
+            file_date = parsed[1]
+            if file_date < cutoff_date:
+                file_path.unlink(missing_ok=True)
+                deleted_count += 1
+                logging.info(f"Deleted old log file: {file_path.name}")
+            else:
+                remaining.append((file_date, file_path))
+
+        # Disk budget: drop the oldest days first, never the files being written today
+        if max_total_bytes:
+            sizes = {path: path.stat().st_size for _, path in remaining if path.exists()}
+            total = sum(sizes.values())
+            for file_date, file_path in sorted(remaining, key=lambda item: item[0]):
+                if total <= max_total_bytes or file_date >= today:
+                    break
+                total -= sizes.get(file_path, 0)
+                file_path.unlink(missing_ok=True)
+                deleted_count += 1
+                logging.info(f"Deleted log file over disk budget: {file_path.name}")
         
         if deleted_count > 0:
-            logging.info(f"Cleaned up {deleted_count} old log files (older than {days_to_keep} days)")
+            from app.core.log_index import prune_indexes
+            prune_indexes(log_dir)
+            logging.info(f"Cleaned up {deleted_count} old log files (older than {days_to_keep} days or over budget)")
         else:
             logging.info("No old log files to clean up")
             
@@ -147,26 +527,115 @@ def get_logger(name: str) -> logging.Logger:
 
 
 # Specialized loggers
-def log_api_request(method: str, url: str, status_code: int, response_time: float, user_id: str = None):
-    """Log API request details"""
+# Messages use %-style arguments and raw values travel in extra["fields"], so
+# nothing is formatted for records below the logger's level. Records that pass
+# are rendered once when queued; fields are only snapshotted in JSON mode.
+def log_api_request(method: str, url: str, status_code: int, response_time: float, user_id: str = None,
+                    timings: Optional[Dict[str, float]] = None, route: Optional[str] = None):
+    """Log API request details, sampling fast successful requests.
+
+    url and user_id may be any object whose str() gives the value, so
+    callers can defer building them until a record is actually written.
+    timings maps request components (db, embed, llm, ...) to milliseconds;
+    route is the matched route template, kept in JSON entries.
+    """
     access_logger = logging.getLogger("access")
-    user_info = f"User: {user_id}" if user_id else "Anonymous"
-    access_logger.info(f"{method} {url} - Status: {status_code} - Time: {response_time:.3f}s - {user_info}")
+    if not access_logger.isEnabledFor(logging.INFO):
+        return
+
+    sample_rate = 1.0
+    if status_code < 400 and response_time < settings.access_log_slow_threshold:
+        sample_rate = settings.access_log_sample_rate
+        if sample_rate < 1.0 and random.random() >= sample_rate:
+            return
+
+    access_logger.info(
+        "%s %s - Status: %d - Time: %.3fs%s - %s%s",
+        method, url, status_code, response_time,
+        # Text lines carry the rate too, so their counts can be scaled back up
+        f" - Sample: {sample_rate:g}" if sample_rate < 1.0 else "",
+        _LazyDetails(("User: {}", user_id)) if user_id is not None else "Anonymous",
+        _LazyTimings(timings),
+        extra={"fields": {
+            "method": method,
+            "url": url,
+            "route": route,
+            "status_code": status_code,
+            "response_time": round(response_time, 6),
+            "user_id": user_id,
+            "sample_rate": sample_rate,
+            "timings": timings
+        }},
+        stacklevel=2
+    )
 
 
 def log_auth_event(event_type: str, email: str, success: bool, ip_address: str = None, details: str = None):
     """Log authentication events"""
     auth_logger = logging.getLogger("auth")
-    status = "SUCCESS" if success else "FAILED"
-    ip_info = f"IP: {ip_address}" if ip_address else ""
-    detail_info = f"Details: {details}" if details else ""
-    auth_logger.info(f"{event_type} - {email} - {status} - {ip_info} {detail_info}".strip())
+    if not auth_logger.isEnabledFor(logging.INFO):
+        return
+
+    auth_logger.info(
+        "%s - %s - %s - %s",
+        event_type, email, "SUCCESS" if success else "FAILED",
+        _LazyDetails(("IP: {}", ip_address or None), ("Details: {}", details or None)),
+        extra={"fields": {
+            "event": event_type,
+            "email": email,
+            "success": success,
+            "ip": ip_address,
+            "details": details
+        }},
+        stacklevel=2
+    )
 
 
 def log_database_operation(operation: str, collection: str, query: dict = None, result_count: int = None, execution_time: float = None):
     """Log database operations"""
     db_logger = logging.getLogger("database")
-    query_info = f"Query: {query}" if query else ""
-    result_info = f"Results: {result_count}" if result_count is not None else ""
-    time_info = f"Time: {execution_time:.3f}s" if execution_time else ""
-    db_logger.info(f"{operation} on {collection} - {query_info} {result_info} {time_info}".strip())
+    if not db_logger.isEnabledFor(logging.INFO):
+        return
+
+    db_logger.info(
+        "%s on %s - %s",
+        operation, collection,
+        _LazyDetails(("Query: {}", query or None), ("Results: {}", result_count), ("Time: {:.3f}s", execution_time or None)),
+        extra={"fields": {
+            "operation": operation,
+            "collection": collection,
+            "query": query,
+            "result_count": result_count,
+            "execution_time": execution_time
+        }},
+        stacklevel=2
+    )
+
+
+class _LazyDetails:
+    """Message argument joining "Label: value" parts only when rendered, skipping None values"""
+
+    __slots__ = ("parts",)
+
+    def __init__(self, *parts):
+        self.parts = parts
+
+    def render(self, render_value) -> str:
+        return " ".join(template.format(render_value(value)) for template, value in self.parts if value is not None)
+
+    def __str__(self) -> str:
+        return self.render(lambda value: value)
+
+
+class _LazyTimings:
+    """Message suffix listing per-component request timings, rendered only when written"""
+
+    __slots__ = ("timings",)
+
+    def __init__(self, timings: Optional[Dict[str, float]]):
+        self.timings = timings
+
+    def __str__(self) -> str:
+        if not self.timings:
+            return ""
+        return " - Timing: " + " ".join(f"{name}={duration:.1f}ms" for name, duration in self.timings.items())
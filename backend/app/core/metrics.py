@@ -0,0 +1,316 @@
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+class _Metric:
+    """Base metric whose values live in one shard per writing thread.
+
+    A thread only ever updates its own shard, so recording needs no lock;
+    collection sums the shards. Shards of finished threads are kept, so
+    counts never go backwards.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: "MetricsRegistry" = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        (registry or metrics_registry).register(self)
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            self._shards.append(values)
+            return values
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def collect(self) -> dict:
+        """Snapshot as plain JSON-serializable data"""
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labels": list(self.labelnames),
+            "values": [[list(key), value] for key, value in self._merged().items()]
+        }
+
+    def _merged(self) -> dict:
+        merged = {}
+        for shard in list(self._shards):
+            for key, value in shard.copy().items():
+                merged[key] = merged.get(key, 0) + value
+        return merged
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with sum and count"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: "MetricsRegistry" = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        entry = shard.get(key)
+        if entry is None:
+            # Per-bucket counts (last one is +Inf), then sum
+            entry = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def collect(self) -> dict:
+        snapshot = super().collect()
+        snapshot["buckets"] = list(self.buckets)
+        return snapshot
+
+    def _merged(self) -> dict:
+        merged = {}
+        for shard in list(self._shards):
+            for key, entry in shard.copy().items():
+                entry = list(entry)
+                total = merged.get(key)
+                merged[key] = entry if total is None else [a + b for a, b in zip(total, entry)]
+        return merged
+
+
+class Gauge(_Metric):
+    """Current value read from a callback when metrics are collected"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: "MetricsRegistry" = None):
+        super().__init__(name, documentation, labelnames, registry)
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set_function(self, function: Callable[[], float], **labels):
+        self._functions[self._key(labels)] = function
+
+    def _merged(self) -> dict:
+        values = {}
+        for key, function in list(self._functions.items()):
+            try:
+                values[key] = float(function())
+            except Exception as e:
+                logger.debug(f"Gauge {self.name}{key} failed: {e}")
+        return values
+
+
+class MetricsRegistry:
+    """All metrics of this process, rendered in the Prometheus text format.
+
+    With a shared directory configured, each worker also writes its snapshot
+    there every few seconds, and rendering sums the snapshots of all live
+    workers: counters and histogram buckets add up, gauges are totals.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._exporter: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {name: metric.collect() for name, metric in self._metrics.items()}
+
+    def _snapshot_path(self, pid: int) -> Path:
+        return Path(settings.metrics_multiprocess_dir) / f"worker-{pid}.json"
+
+    def start_exporter(self):
+        """Periodically publish this worker's snapshot for the other workers"""
+        if not settings.metrics_multiprocess_dir or self._exporter is not None:
+            return
+        Path(settings.metrics_multiprocess_dir).mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._exporter = threading.Thread(target=self._export_loop, name="metrics-exporter", daemon=True)
+        self._exporter.start()
+
+    def stop_exporter(self):
+        """Stop publishing and withdraw this worker's snapshot"""
+        if self._exporter is None:
+            return
+        self._stop.set()
+        self._exporter.join()
+        self._exporter = None
+        self._snapshot_path(os.getpid()).unlink(missing_ok=True)
+
+    def _export_loop(self):
+        while not self._stop.wait(settings.metrics_flush_interval):
+            try:
+                self._write_snapshot()
+            except Exception as e:
+                logger.error(f"Failed to write metrics snapshot: {e}")
+
+    def _write_snapshot(self):
+        path = self._snapshot_path(os.getpid())
+        temp = path.with_suffix(".tmp")
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(temp, path)
+
+    def _worker_snapshots(self) -> Iterable[Dict[str, dict]]:
+        """This worker's live snapshot plus the recent ones of the other workers"""
+        yield self.snapshot()
+        if not settings.metrics_multiprocess_dir:
+            return
+
+        own = self._snapshot_path(os.getpid())
+        stale_before = time.time() - 3 * settings.metrics_flush_interval
+        for path in Path(settings.metrics_multiprocess_dir).glob("worker-*.json"):
+            try:
+                if path == own or path.stat().st_mtime < stale_before:
+                    continue
+                with open(path, "r", encoding="utf-8") as f:
+                    yield json.load(f)
+            except (OSError, ValueError):
+                # Removed or being replaced by its worker
+                continue
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        merged: Dict[str, dict] = {}
+        for snapshot in self._worker_snapshots():
+            for name, metric in snapshot.items():
+                target = merged.setdefault(name, {**metric, "values": {}})
+                for key, value in metric["values"]:
+                    key = tuple(key)
+                    total = target["values"].get(key)
+                    if total is None:
+                        target["values"][key] = value
+                    elif isinstance(value, list):
+                        target["values"][key] = [a + b for a, b in zip(total, value)]
+                    else:
+                        target["values"][key] = total + value
+
+        lines = []
+        for name in sorted(merged):
+            metric = merged[name]
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for key, value in sorted(metric["values"].items()):
+                labels = list(zip(metric["labels"], key))
+                if metric["type"] == "histogram":
+                    cumulative = 0
+                    for bound, count in zip(metric["buckets"] + ["+Inf"], value[:-1]):
+                        cumulative += count
+                        le = bound if bound == "+Inf" else _format_value(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value[-1])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels) + "}"
+
+
+# Singleton instance
+metrics_registry = MetricsRegistry()
+
+# HTTP
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency by route template",
+    ["method", "route", "status"]
+)
+
+# MongoDB (pymongo command monitoring)
+mongodb_command_duration = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency",
+    ["command", "collection"]
+)
+mongodb_command_failures = Counter(
+    "mongodb_command_failures_total", "Failed MongoDB commands",
+    ["command", "collection"]
+)
+
+# Embeddings
+embedding_encode_duration = Histogram(
+    "embedding_encode_duration_seconds", "SentenceTransformer encode time",
+    ["kind"]
+)
+embedding_batch_size = Histogram(
+    "embedding_batch_size", "Texts per encode call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+
+# Groq LLM
+llm_request_duration = Histogram(
+    "llm_request_duration_seconds", "Groq request latency, including failures",
+    ["operation"], buckets=DEFAULT_BUCKETS + (15.0, 30.0)
+)
+llm_request_failures = Counter(
+    "llm_request_failures_total", "Failed Groq requests",
+    ["operation"]
+)
+
+# Search
+search_stage_duration = Histogram(
+    "search_stage_duration_seconds", "Time spent per search stage",
+    ["stage"]
+)
+
+# Queues
+queue_depth = Gauge(
+    "queue_depth", "Items waiting in internal queues and worker pools",
+    ["queue"]
+)
+log_records_dropped = Counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full"
+)
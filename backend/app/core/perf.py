@@ -0,0 +1,158 @@
+import functools
+import inspect
+import itertools
+import threading
+import time
+from array import array
+from typing import Callable, Dict, List, Optional
+from app.core.config import settings
+
+
+class PerfRecorder:
+    """Fixed-size ring buffer of service method calls.
+
+    Each field lives in its own preallocated array, so recording a call
+    writes four slots and allocates nothing; once full, the oldest calls
+    are overwritten. Slots are claimed with an atomic counter, so the event
+    loop and executor threads record without a lock.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._register_lock = threading.Lock()
+        self._counter = itertools.count()
+        # perf_counter() plus this offset gives wall-clock time
+        self._clock_offset = time.time() - time.perf_counter()
+
+        self._method = array("i", [-1]) * capacity  # -1 marks an empty or half-written slot
+        self._started = array("d", [0.0]) * capacity  # perf_counter() at call start
+        self._duration = array("d", [0.0]) * capacity  # seconds
+        self._size = array("q", [-1]) * capacity  # len() of the result; -1 when it has none
+        self._failed = array("b", [0]) * capacity
+
+    def register(self, name: str) -> int:
+        """Id of a method name, assigned once when a method is instrumented"""
+        with self._register_lock:
+            if name not in self._name_ids:
+                self._name_ids[name] = len(self._names)
+                self._names.append(name)
+            return self._name_ids[name]
+
+    def record(self, method_id: int, started: float, duration: float, failed: bool, size: int):
+        slot = next(self._counter) % self.capacity
+        self._method[slot] = -1
+        self._started[slot] = started
+        self._duration[slot] = duration
+        self._size[slot] = size
+        self._failed[slot] = failed
+        self._method[slot] = method_id
+
+    def snapshot(self, slow_threshold: float, slow_limit: int = 50) -> dict:
+        """Per-method counts, error rates and percentiles, plus the most recent slow calls"""
+        durations: Dict[int, List[float]] = {}
+        failures: Dict[int, int] = {}
+        sizes: Dict[int, List[int]] = {}
+        slow = []
+        for slot in range(self.capacity):
+            method_id = self._method[slot]
+            if method_id < 0:
+                continue
+            duration = self._duration[slot]
+            durations.setdefault(method_id, []).append(duration)
+            if self._failed[slot]:
+                failures[method_id] = failures.get(method_id, 0) + 1
+            if self._size[slot] >= 0:
+                sizes.setdefault(method_id, []).append(self._size[slot])
+            if duration >= slow_threshold:
+                slow.append(slot)
+
+        methods = []
+        for method_id, values in durations.items():
+            values.sort()
+            method_sizes = sizes.get(method_id)
+            methods.append({
+                "method": self._names[method_id],
+                "calls": len(values),
+                "error_rate": round(failures.get(method_id, 0) / len(values), 4),
+                "p50_ms": _percentile_ms(values, 0.5),
+                "p95_ms": _percentile_ms(values, 0.95),
+                "p99_ms": _percentile_ms(values, 0.99),
+                "max_ms": round(values[-1] * 1000, 2),
+                "avg_payload": round(sum(method_sizes) / len(method_sizes), 1) if method_sizes else None
+            })
+        methods.sort(key=lambda method: method["p99_ms"], reverse=True)
+
+        slow.sort(key=lambda slot: self._started[slot], reverse=True)
+        return {
+            "capacity": self.capacity,
+            "recorded": sum(len(values) for values in durations.values()),
+            "methods": methods,
+            "slow_calls": [
+                {
+                    "method": self._names[self._method[slot]],
+                    "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._started[slot] + self._clock_offset)),
+                    "duration_ms": round(self._duration[slot] * 1000, 2),
+                    "failed": bool(self._failed[slot]),
+                    "payload_size": self._size[slot] if self._size[slot] >= 0 else None
+                }
+                for slot in slow[:slow_limit]
+            ]
+        }
+
+
+def _percentile_ms(sorted_values: List[float], q: float) -> float:
+    return round(sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))] * 1000, 2)
+
+
+def _payload_size(result) -> int:
+    if result is None:
+        return 0
+    try:
+        return len(result)
+    except TypeError:
+        return -1
+
+
+def instrument(function: Callable) -> Callable:
+    """Record every call of a sync or async method in perf_recorder.
+
+    Captures duration, whether it raised, and the len() of its result.
+    """
+    if not settings.perf_instrumentation_enabled:
+        return function
+    method_id = perf_recorder.register(function.__qualname__)
+
+    if inspect.iscoroutinefunction(function):
+        @functools.wraps(function)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            failed = True
+            size = -1
+            try:
+                result = await function(*args, **kwargs)
+                failed = False
+                size = _payload_size(result)
+                return result
+            finally:
+                perf_recorder.record(method_id, started, time.perf_counter() - started, failed, size)
+        return async_wrapper
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        failed = True
+        size = -1
+        try:
+            result = function(*args, **kwargs)
+            failed = False
+            size = _payload_size(result)
+            return result
+        finally:
+            perf_recorder.record(method_id, started, time.perf_counter() - started, failed, size)
+    return wrapper
+
+
+# Singleton instance
+perf_recorder = PerfRecorder(settings.perf_buffer_size)
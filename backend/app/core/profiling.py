@@ -0,0 +1,166 @@
+import cProfile
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Path("logs") / "profiles"
+PROFILE_SUFFIXES = (".pstats", ".collapsed")
+
+
+class SamplingProfiler:
+    """Statistical profiler: samples one thread's stack at a fixed interval.
+
+    Produces collapsed stacks ("root;caller;callee count" per line), the
+    input format of flamegraph tools. Runs in its own thread, so the
+    profiled code is only slowed by the sampling itself.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path: Path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RequestProfile:
+    """One profiled request: cProfile (deterministic) or sampling mode"""
+
+    # cProfile hooks the whole thread, so only one request is profiled at a time
+    _lock = threading.Lock()
+
+    def __init__(self, mode: str):
+        self.mode = mode if mode in ("cprofile", "sampling") else settings.profiling_mode
+        self._profiler = None
+        # Most other requests in flight at once while profiling; their work is in the profile too
+        self.concurrent_requests = 0
+
+    def note_concurrency(self, other_requests: int):
+        self.concurrent_requests = max(self.concurrent_requests, other_requests)
+
+    def start(self) -> bool:
+        """Begin profiling; False if another request is being profiled"""
+        if not RequestProfile._lock.acquire(blocking=False):
+            return False
+        if self.mode == "sampling":
+            self._profiler = SamplingProfiler(threading.get_ident(), settings.profiling_sample_interval)
+            self._profiler.start()
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return True
+
+    def stop(self):
+        try:
+            if self.mode == "sampling":
+                self._profiler.stop()
+            else:
+                self._profiler.disable()
+        finally:
+            RequestProfile._lock.release()
+
+    def file_name(self, method: str, path: str, duration: float) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_")[:60] or "root"
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        suffix = ".collapsed" if self.mode == "sampling" else ".pstats"
+        return f"{timestamp}-{method}-{slug}-{duration * 1000:.0f}ms{suffix}"
+
+    def save(self, name: str):
+        """Write the profile and enforce retention; runs off the event loop"""
+        try:
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            path = PROFILE_DIR / name
+            if self.mode == "sampling":
+                self._profiler.dump(path)
+            else:
+                self._profiler.dump_stats(path)
+            with open(_metadata_path(path), "w", encoding="utf-8") as f:
+                json.dump({"mode": self.mode, "concurrent_requests": self.concurrent_requests}, f)
+            logger.info(f"Saved request profile: {name}")
+            cleanup_profiles(settings.profiling_max_files)
+        except Exception as e:
+            logger.error(f"Failed to save request profile {name}: {e}")
+
+
+def list_profiles() -> List[Dict]:
+    """Stored profiles, newest first"""
+    if not PROFILE_DIR.exists():
+        return []
+    profiles = []
+    for path in PROFILE_DIR.iterdir():
+        if path.suffix not in PROFILE_SUFFIXES:
+            continue
+        stat = path.stat()
+        profiles.append({
+            "name": path.name,
+            "format": path.suffix[1:],
+            "size": stat.st_size,
+            "created": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            "concurrent_requests": _read_metadata(path).get("concurrent_requests")
+        })
+    profiles.sort(key=lambda profile: profile["created"], reverse=True)
+    return profiles
+
+
+def find_profile(name: str) -> Optional[Path]:
+    """Path of a stored profile; None for unknown or unsafe names"""
+    path = PROFILE_DIR / name
+    if path.name != name or path.suffix not in PROFILE_SUFFIXES or not path.is_file():
+        return None
+    return path
+
+
+def cleanup_profiles(max_files: int):
+    """Delete the oldest profiles beyond max_files"""
+    paths = sorted(
+        (path for path in PROFILE_DIR.iterdir() if path.suffix in PROFILE_SUFFIXES),
+        key=lambda path: path.stat().st_mtime
+    )
+    for path in paths[:max(0, len(paths) - max_files)]:
+        path.unlink(missing_ok=True)
+        _metadata_path(path).unlink(missing_ok=True)
+
+
+def _metadata_path(path: Path) -> Path:
+    return path.with_name(path.name + ".json")
+
+
+def _read_metadata(path: Path) -> dict:
+    try:
+        with open(_metadata_path(path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
@@ -0,0 +1,46 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Optional
+
+# Milliseconds spent per component during the current request. Tasks started
+# by the request inherit the same dict; executor threads do not, so time work
+# sent to a pool from the awaiting coroutine.
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def start_request_timing() -> Token:
+    """Begin collecting timings for a new request"""
+    return _request_timings.set({})
+
+
+def end_request_timing(token: Token):
+    _request_timings.reset(token)
+
+
+def record_timing(name: str, seconds: float):
+    """Add time to a component of the current request; a no-op outside requests"""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds * 1000
+
+
+@contextmanager
+def timed(name: str):
+    """Record the duration of the with-block under name"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, time.perf_counter() - start)
+
+
+def get_request_timings() -> Dict[str, float]:
+    """Copy of the current request's timings in milliseconds"""
+    timings = _request_timings.get()
+    return dict(timings) if timings else {}
+
+
+def format_server_timing(timings: Dict[str, float]) -> str:
+    """Server-Timing header value, e.g. db;dur=12.0, embed;dur=40.3"""
+    return ", ".join(f"{name};dur={duration:.1f}" for name, duration in timings.items())
@@ -1,5 +1,7 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 from app.core.config import settings
+from app.core.metrics import mongodb_command_duration, mongodb_command_failures
+from app.core.request_timing import record_timing
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,6 +16,28 @@ class Database:
 db = Database()
 
 
+class CommandMetricsListener(monitoring.CommandListener):
+    """Feeds every MongoDB command's duration into the metrics registry and request timings"""
+
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self._collections[(event.connection_id, event.request_id)] = collection if isinstance(collection, str) else ""
+
+    def succeeded(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        mongodb_command_duration.observe(event.duration_micros / 1e6, command=event.command_name, collection=collection)
+        record_timing("db", event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        mongodb_command_duration.observe(event.duration_micros / 1e6, command=event.command_name, collection=collection)
+        record_timing("db", event.duration_micros / 1e6)
+        mongodb_command_failures.inc(command=event.command_name, collection=collection)
+
+
 def get_database():
     return db.database
 
@@ -21,7 +45,8 @@ def get_database():
 def connect_to_mongo():
     """Create database connection"""
     try:
-        db.client = MongoClient(settings.mongo_uri)
+        event_listeners = [CommandMetricsListener()] if settings.metrics_enabled else []
+        db.client = MongoClient(settings.mongo_uri, event_listeners=event_listeners)
         db.database = db.client.get_default_database()
 
         # Test the connection
@@ -1,80 +1,164 @@
 import time
+import hashlib
 import logging
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.core.logging_config import log_api_request
+from app.core.metrics import http_request_duration
+from app.core.request_timing import start_request_timing, end_request_timing, get_request_timings, format_server_timing
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all API requests and responses"""
-    
-    def __init__(self, app):
-        super().__init__(app)
-        self.logger = logging.getLogger("access")
-    
-    async def dispatch(self, request: Request, call_next):
-        # Start timing
-        start_time = time.time()
-        
-        # Get client IP
-        client_ip = self.get_client_ip(request)
-        
-        # Get user info if available
-        user_id = None
+class _RequestURL:
+    """Request URL rebuilt from the ASGI scope only if a log record renders it"""
+
+    __slots__ = ("scope",)
+
+    def __init__(self, scope: Scope):
+        self.scope = scope
+
+    def __str__(self) -> str:
+        return str(Request(self.scope).url)
+
+
+class _TokenSubject:
+    """JWT subject of the request, decoded only if a log record renders it"""
+
+    __slots__ = ("token",)
+
+    def __init__(self, token: str):
+        self.token = token
+
+    def __str__(self) -> str:
+        from jose import JWTError, jwt
+        from app.auth.security import token_cache
+        from app.core.config import settings
+
+        # verify_token has usually cached this token already
+        token_data = token_cache.get(hashlib.sha256(self.token.encode()).digest())
+        if token_data is not None:
+            return token_data.user_id
         try:
-            # Try to extract user from token if present
-            auth_header = request.headers.get("authorization")
-            if auth_header and auth_header.startswith("Bearer "):
-                # You could decode the JWT here to get user info
-                # For now, we'll just note that it's an authenticated request
-                user_id = "authenticated"
-        except Exception:
-            pass
-        
+            payload = jwt.decode(self.token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+            return str(payload.get("sub") or "unknown")
+        except JWTError:
+            return "invalid-token"
+
+
+class LoggingMiddleware:
+    """ASGI middleware to log all API requests and responses.
+
+    Wraps send() only to read the status and add X-Process-Time to the
+    response start message, so bodies (including streams) pass through
+    untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.logger = logging.getLogger("access")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Start timing; services add their share through request_timing
+        start_time = time.perf_counter_ns()
+        status_code = 500
+        timing_token = start_request_timing()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = (time.perf_counter_ns() - start_time) / 1e9
+                timings = get_request_timings()
+                timings["total"] = process_time * 1000
+                message["headers"] = list(message.get("headers", ())) + [
+                    (b"x-process-time", str(process_time).encode()),
+                    (b"server-timing", format_server_timing(timings).encode())
+                ]
+            await send(message)
+
         # Process the request
         try:
-            response = await call_next(request)
-            
-            # Calculate response time
-            process_time = time.time() - start_time
-            
-            # Log the request
-            log_api_request(
-                method=request.method,
-                url=str(request.url),
-                status_code=response.status_code,
-                response_time=process_time,
-                user_id=user_id
-            )
-            
-            # Add response time header
-            response.headers["X-Process-Time"] = str(process_time)
-            
-            return response
-            
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             # Calculate response time even for errors
-            process_time = time.time() - start_time
-            
+            process_time = (time.perf_counter_ns() - start_time) / 1e9
+            http_request_duration.observe(process_time, method=scope["method"], route=route_template(scope), status=500)
+            client_ip = get_client_ip(Request(scope))
+
             # Log the error
-            self.logger.error(f"Request failed: {request.method} {request.url} - Error: {str(e)} - Time: {process_time:.3f}s - IP: {client_ip}")
-            
+            self.logger.error(
+                "Request failed: %s %s - Error: %s - Time: %.3fs - IP: %s",
+                scope["method"], _RequestURL(scope), e, process_time, client_ip,
+                extra={"fields": {
+                    "method": scope["method"],
+                    "url": _RequestURL(scope),
+                    "error": str(e),
+                    "response_time": round(process_time, 6),
+                    "ip": client_ip
+                }}
+            )
+
             # Re-raise the exception
             raise
-    
+        finally:
+            timings = get_request_timings()
+            end_request_timing(timing_token)
+
+        process_time = (time.perf_counter_ns() - start_time) / 1e9
+        route = route_template(scope)
+        http_request_duration.observe(process_time, method=scope["method"], route=route, status=status_code)
+
+        # Log the request; URL and user are only rendered if the record is written
+        log_api_request(
+            method=scope["method"],
+            url=_RequestURL(scope),
+            status_code=status_code,
+            response_time=process_time,
+            user_id=self.get_token_subject(scope),
+            timings=timings,
+            route=route
+        )
+
+    def get_token_subject(self, scope: Scope):
+        """Lazy JWT subject for authenticated requests, else None"""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                value = value.decode("latin-1")
+                if value.startswith("Bearer "):
+                    return _TokenSubject(value[7:])
+                return None
+        return None
+
     def get_client_ip(self, request: Request) -> str:
         """Extract client IP address from request"""
-        # Check for forwarded headers first (for reverse proxies)
-        forwarded_for = request.headers.get("x-forwarded-for")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-        
-        real_ip = request.headers.get("x-real-ip")
-        if real_ip:
-            return real_ip
-        
-        # Fall back to direct client IP
-        if hasattr(request.client, 'host'):
-            return request.client.host
-        
-        return "unknown"
+        return get_client_ip(request)
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the matched route, so metrics don't get a series per task id"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Plain Starlette routes (docs, openapi.json) have no parameters
+    return scope["path"] if "endpoint" in scope else "unmatched"
+
+
+def get_client_ip(request: Request) -> str:
+    """Extract client IP address from request"""
+    # Check for forwarded headers first (for reverse proxies)
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if forwarded_for:
+        return forwarded_for.split(",")[0].strip()
+    
+    real_ip = request.headers.get("x-real-ip")
+    if real_ip:
+        return real_ip
+    
+    # Fall back to direct client IP
+    if hasattr(request.client, 'host'):
+        return request.client.host
+    
+    return "unknown"
@@ -0,0 +1,100 @@
+import asyncio
+import itertools
+import logging
+import time
+from jose import JWTError, jwt
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.profiling import RequestProfile
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+
+
+class ProfilingMiddleware:
+    """Profiles requests asked for by an admin (X-Profile header) or 1 in N sampled.
+
+    Only installed when PROFILING_ENABLED is set, so it costs nothing
+    otherwise. The profile file name is returned in X-Profile-Id.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._request_counter = itertools.count(1)
+        self._in_flight = 0
+        self._active_profile = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self._in_flight += 1
+        try:
+            await self._handle(scope, receive, send)
+        finally:
+            self._in_flight -= 1
+
+    async def _handle(self, scope: Scope, receive: Receive, send: Send):
+        if self._active_profile is not None:
+            # The profiler hooks the whole loop thread, so this request's work lands in that profile
+            self._active_profile.note_concurrency(self._in_flight - 1)
+
+        mode = self._requested_mode(scope)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(mode)
+        if not profile.start():
+            # Another request is being profiled
+            await self.app(scope, receive, send)
+            return
+        profile.note_concurrency(self._in_flight - 1)
+        self._active_profile = profile
+
+        start_time = time.perf_counter()
+        profile_name = None
+
+        async def send_wrapper(message: Message):
+            nonlocal profile_name
+            if message["type"] == "http.response.start":
+                profile_name = profile.file_name(scope["method"], scope["path"], time.perf_counter() - start_time)
+                message["headers"] = list(message.get("headers", ())) + [(b"x-profile-id", profile_name.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._active_profile = None
+            profile.stop()
+            if profile_name is None:
+                profile_name = profile.file_name(scope["method"], scope["path"], time.perf_counter() - start_time)
+            asyncio.get_running_loop().run_in_executor(None, profile.save, profile_name)
+
+    def _requested_mode(self, scope: Scope):
+        """Profiler mode for this request, or None to run it unprofiled"""
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                if self._is_admin(scope):
+                    return value.decode("latin-1").strip().lower()
+                logger.warning(f"Ignoring X-Profile header from non-admin request to {scope['path']}")
+                break
+
+        if settings.profiling_sample_every and next(self._request_counter) % settings.profiling_sample_every == 0:
+            return settings.profiling_mode
+        return None
+
+    def _is_admin(self, scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                value = value.decode("latin-1")
+                if not value.startswith("Bearer "):
+                    return False
+                try:
+                    payload = jwt.decode(value[7:], settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+                except JWTError:
+                    return False
+                return payload.get("sub") in settings.profiling_admin_user_ids
+        return False
@@ -2,8 +2,11 @@ from fastapi import APIRouter, HTTPException, status, Depends, Request
 from app.models.user import UserCreate, UserLogin, UserResponse, Token
 from app.services.user_service import user_service
 from app.auth.security import create_access_token, verify_token
+from app.auth.rate_limit import login_rate_limiter
 from app.models.user import TokenData
 from app.core.logging_config import log_auth_event
+from app.middleware.logging_middleware import get_client_ip
+import math
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -51,7 +54,17 @@ async def register(user_data: UserCreate, request: Request):
 @router.post("/login", response_model=dict)
 async def login(user_data: UserLogin, request: Request):
     """Login user"""
-    client_ip = getattr(request.client, 'host', 'unknown') if request.client else 'unknown'
+    client_ip = get_client_ip(request)
+
+    # Throttle before any bcrypt work happens
+    retry_after = login_rate_limiter.check(client_ip, user_data.email)
+    if retry_after is not None:
+        log_auth_event("LOGIN", user_data.email, False, client_ip, "Rate limited")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts. Please try again later.",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
 
     user = await user_service.authenticate_user(user_data.email, user_data.password)
 
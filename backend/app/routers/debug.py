@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from app.models.user import TokenData
+from app.auth.security import verify_token
+from app.core.config import settings
+from app.core.perf import perf_recorder
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/perf")
+async def service_performance(
+    slow_limit: int = Query(50, ge=0, le=1000, description="Maximum number of slow calls to list"),
+    token_data: TokenData = Depends(verify_token)
+):
+    """Per-method latency percentiles and recent slow calls of the instrumented services (this worker)"""
+    if token_data.user_id not in settings.profiling_admin_user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Performance data is only available to profiling admins"
+        )
+
+    return {
+        "enabled": settings.perf_instrumentation_enabled,
+        "slow_threshold_ms": settings.perf_slow_threshold * 1000,
+        **perf_recorder.snapshot(settings.perf_slow_threshold, slow_limit)
+    }
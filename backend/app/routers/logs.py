@@ -1,11 +1,24 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from typing import Optional, List
 import os
 from pathlib import Path
 from datetime import datetime, timedelta
+import asyncio
 import glob
+import json
+import logging
+import re
 from app.models.user import TokenData
 from app.auth.security import verify_token
+from app.core.config import settings
+from app.core.profiling import list_profiles, find_profile
+from app.core.logging_config import parse_log_file_name, find_log_file
+from app.core.log_index import update_index, line_offset
+from app.core.log_reader import read_log_page
+from app.core.log_search import compile_pattern, format_bound, log_search_executor, search_file
+from app.core.log_stream import log_stream_hub
+from app.core.latency import BASE_BUCKET_MINUTES, latency_report
 
 router = APIRouter(prefix="/logs", tags=["logs"])
 
@@ -19,20 +32,20 @@ async def list_log_files(token_data: TokenData = Depends(verify_token)):
             return {"files": []}
         
         log_files = []
-        patterns = ['app-*.log', 'error-*.log', 'access-*.log', 'database-*.log', 'auth-*.log']
-        
-        for pattern in patterns:
-            files = glob.glob(str(log_dir / pattern))
-            for file_path in files:
-                file_info = Path(file_path)
-                stat = file_info.stat()
-                log_files.append({
-                    "name": file_info.name,
-                    "type": file_info.name.split('-')[0],
-                    "date": file_info.name.split('-')[1].replace('.log', ''),
-                    "size": stat.st_size,
-                    "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
-                })
+        
+        for file_info in log_dir.iterdir():
+            parsed = parse_log_file_name(file_info)
+            if parsed is None:
+                continue
+            stat = file_info.stat()
+            log_files.append({
+                "name": file_info.name,
+                "type": parsed[0],
+                "date": parsed[1].strftime('%Y-%m-%d'),
+                "size": stat.st_size,
+                "compressed": file_info.name.endswith('.gz'),
+                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
+            })
         
         # Sort by date descending
         log_files.sort(key=lambda x: x['date'], reverse=True)
@@ -50,11 +63,19 @@ async def list_log_files(token_data: TokenData = Depends(verify_token)):
 async def view_log(
     log_type: str,
     date: Optional[str] = Query(None, description="Date in YYYY-MM-DD format"),
-    lines: int = Query(100, description="Number of lines to return"),
+    lines: int = Query(100, ge=1, le=5000, description="Number of lines to return"),
     search: Optional[str] = Query(None, description="Search term"),
+    before: Optional[int] = Query(None, ge=0, description="Byte offset cursor: return the lines ending before it (older page)"),
+    after: Optional[int] = Query(None, ge=0, description="Byte offset cursor: return the lines starting at it (newer page)"),
+    from_line: Optional[int] = Query(None, ge=0, description="Return the lines starting at this 0-based line number"),
     token_data: TokenData = Depends(verify_token)
 ):
-    """View log file contents"""
+    """View log file contents.
+
+    By default returns the last lines of the file. Pass start_offset from a
+    response as `before` to page backwards, or end_offset as `after` to page
+    forwards. `from_line` jumps to a line number via the sidecar index.
+    """
     try:
         # Validate log type
         valid_types = ['app', 'error', 'access', 'database', 'auth']
@@ -63,6 +84,18 @@ async def view_log(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid log type. Must be one of: {valid_types}"
             )
+
+        if before is not None and after is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use either before or after, not both"
+            )
+
+        if from_line is not None and (before is not None or after is not None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="from_line cannot be combined with before or after"
+            )
         
         # Use today's date if not specified
         if not date:
@@ -77,30 +110,36 @@ async def view_log(
                 detail="Invalid date format. Use YYYY-MM-DD"
             )
         
-        log_file = Path(f"logs/{log_type}-{date}.log")
+        log_file = find_log_file(Path("logs"), log_type, date)
         
-        if not log_file.exists():
+        if log_file is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Log file not found: {log_file.name}"
+                detail=f"Log file not found: {log_type}-{date}.log"
             )
         
-        # Read log file
-        with open(log_file, 'r', encoding='utf-8') as f:
-            all_lines = f.readlines()
-        
-        # Filter by search term if provided
-        if search:
-            all_lines = [line for line in all_lines if search.lower() in line.lower()]
+        loop = asyncio.get_running_loop()
+        if from_line is not None:
+            after = await loop.run_in_executor(None, line_offset, log_file, from_line)
+            if after is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Line {from_line} is past the end of {log_file.name}"
+                )
         
-        # Get last N lines
-        log_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
+        # Block-wise scan that stops once the page is full, off the event loop
+        page = await loop.run_in_executor(
+            None, read_log_page, log_file, lines, search, before, after
+        )
+        # Kept for existing clients; counted incrementally by the sidecar index
+        index = await loop.run_in_executor(None, update_index, log_file)
         
         return {
             "file": log_file.name,
-            "total_lines": len(all_lines),
-            "returned_lines": len(log_lines),
-            "lines": [line.rstrip() for line in log_lines]
+            "file_size": log_file.stat().st_size,
+            "total_lines": index["lines"],
+            "returned_lines": len(page["lines"]),
+            **page
         }
         
     except HTTPException:
@@ -112,6 +151,168 @@ async def view_log(
         )
 
 
+@router.get("/search")
+async def search_logs(
+    q: str = Query(..., min_length=1, description="Literal text, or a regular expression with regex=true"),
+    regex: bool = Query(False, description="Treat q as a regular expression"),
+    case_sensitive: bool = Query(False),
+    types: Optional[str] = Query(None, description="Comma-separated log types (default: all)"),
+    start_date: Optional[str] = Query(None, description="First day, YYYY-MM-DD (default: since's day, else end_date)"),
+    end_date: Optional[str] = Query(None, description="Last day, YYYY-MM-DD (default: until's day, else today)"),
+    since: Optional[datetime] = Query(None, description="Only lines logged at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only lines logged at or before this time"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum number of matching lines"),
+    token_data: TokenData = Depends(verify_token)
+):
+    """Search several log types over a range of days.
+
+    Files are scanned in parallel on a thread pool and matches are
+    streamed as NDJSON, one object per line, oldest day first, followed by a
+    summary object.
+    """
+    valid_types = ['app', 'error', 'access', 'database', 'auth']
+    log_types = [t.strip() for t in types.split(',') if t.strip()] if types else valid_types
+    invalid = [t for t in log_types if t not in valid_types]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid log type. Must be one of: {valid_types}"
+        )
+
+    try:
+        last_day = datetime.strptime(end_date, '%Y-%m-%d') if end_date else (until or datetime.now())
+        first_day = datetime.strptime(start_date, '%Y-%m-%d') if start_date else (since or last_day)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format. Use YYYY-MM-DD"
+        )
+    first_day, last_day = first_day.date(), last_day.date()
+    if first_day > last_day:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date"
+        )
+    if (last_day - first_day).days >= settings.log_search_max_days:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range too wide. Search at most {settings.log_search_max_days} days"
+        )
+
+    try:
+        pattern = compile_pattern(q, regex, case_sensitive)
+    except re.error as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid regular expression: {e}"
+        )
+
+    log_dir = Path("logs")
+    files = []
+    day = first_day
+    while day <= last_day:
+        for log_type in log_types:
+            log_file = find_log_file(log_dir, log_type, day.isoformat())
+            if log_file is not None:
+                files.append((log_type, day.isoformat(), log_file))
+        day += timedelta(days=1)
+
+    since_bound, until_bound = format_bound(since), format_bound(until)
+
+    async def results():
+        loop = asyncio.get_running_loop()
+        # Every file is submitted at once; results are emitted in file order as they complete
+        futures = [
+            loop.run_in_executor(log_search_executor, search_file, log_file, pattern, since_bound, until_bound, limit)
+            for _, _, log_file in files
+        ]
+        found = 0
+        truncated = False
+        try:
+            for position, ((log_type, date, log_file), future) in enumerate(zip(files, futures)):
+                try:
+                    matches, cut = await future
+                except OSError as e:
+                    yield json.dumps({"file": log_file.name, "error": str(e)}) + "\n"
+                    continue
+                kept = matches[:limit - found]
+                for offset, line in kept:
+                    yield json.dumps({
+                        "file": log_file.name,
+                        "type": log_type,
+                        "date": date,
+                        "offset": offset,
+                        "line": line
+                    }) + "\n"
+                found += len(kept)
+                if found == limit:
+                    truncated = cut or len(kept) < len(matches) or position + 1 < len(files)
+                    break
+            yield json.dumps({"summary": {"matches": found, "files": len(files), "truncated": truncated}}) + "\n"
+        finally:
+            # Client gone or cap reached: drop scans that have not started
+            for future in futures:
+                future.cancel()
+
+    return StreamingResponse(
+        results(),
+        media_type="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/stream/{log_type}")
+async def stream_log(
+    log_type: str,
+    search: Optional[str] = Query(None, description="Only lines containing this text (case-insensitive)"),
+    level: Optional[str] = Query(None, description="Only records at or above this level"),
+    token_data: TokenData = Depends(verify_token)
+):
+    """Live log lines as Server-Sent Events, pushed as this worker writes them.
+
+    Events are `log` (data: {"line": ...}) and `dropped` (data: {"count": n})
+    when the client fell behind and lines were skipped.
+    """
+    valid_types = ['app', 'error', 'access', 'database', 'auth']
+    if log_type not in valid_types:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid log type. Must be one of: {valid_types}"
+        )
+
+    levels = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
+    if level is not None and level.upper() not in levels:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid level. Must be one of: {levels}"
+        )
+    min_level = logging.getLevelName(level.upper()) if level else logging.NOTSET
+
+    async def event_stream():
+        # Subscribed here, so the finally below always runs for it
+        subscription = log_stream_hub.subscribe(log_type, min_level, search, settings.log_stream_buffer)
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(subscription.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                dropped = subscription.take_dropped()
+                if dropped:
+                    yield f"event: dropped\ndata: {json.dumps({'count': dropped})}\n\n"
+                yield f"event: log\ndata: {json.dumps({'line': line})}\n\n"
+        finally:
+            log_stream_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/stats")
 async def log_stats(token_data: TokenData = Depends(verify_token)):
     """Get log statistics"""
@@ -122,6 +323,7 @@ async def log_stats(token_data: TokenData = Depends(verify_token)):
         
         stats = {}
         today = datetime.now().strftime('%Y-%m-%d')
+        loop = asyncio.get_running_loop()
         
         log_types = ['app', 'error', 'access', 'database', 'auth']
         
@@ -129,24 +331,26 @@ async def log_stats(token_data: TokenData = Depends(verify_token)):
             log_file = log_dir / f"{log_type}-{today}.log"
             
             if log_file.exists():
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
+                # Sidecar index: only bytes written since the last call are read
+                index = await loop.run_in_executor(None, update_index, log_file)
+                file_stat = log_file.stat()
                 
                 stats[log_type] = {
-                    "total_lines": len(lines),
-                    "file_size": log_file.stat().st_size,
-                    "last_modified": datetime.fromtimestamp(log_file.stat().st_mtime).isoformat()
+                    "total_lines": index["lines"],
+                    "file_size": file_stat.st_size,
+                    "last_modified": datetime.fromtimestamp(file_stat.st_mtime).isoformat()
                 }
                 
                 # Count log levels for app and error logs
                 if log_type in ['app', 'error']:
-                    levels = {'DEBUG': 0, 'INFO': 0, 'WARNING': 0, 'ERROR': 0, 'CRITICAL': 0}
-                    for line in lines:
-                        for level in levels.keys():
-                            if f" - {level} - " in line:
-                                levels[level] += 1
-                                break
-                    stats[log_type]['levels'] = levels
+                    stats[log_type]['levels'] = index["levels"]
+
+                # Status classes for access logs, scaled back up by each line's sample rate
+                if log_type == 'access':
+                    stats[log_type]['status_classes'] = {
+                        name: round(count) for name, count in index["status_classes"].items()
+                    }
+                    stats[log_type]['estimated_requests'] = round(index["estimated_requests"])
             else:
                 stats[log_type] = {
                     "total_lines": 0,
@@ -154,7 +358,9 @@ async def log_stats(token_data: TokenData = Depends(verify_token)):
                     "last_modified": None
                 }
         
-        return {"stats": stats, "date": today}
+        from app.core.logging_config import get_log_queue_stats
+
+        return {"stats": stats, "date": today, "queue": get_log_queue_stats()}
         
     except Exception as e:
         raise HTTPException(
@@ -163,6 +369,71 @@ async def log_stats(token_data: TokenData = Depends(verify_token)):
         )
 
 
+@router.get("/latency")
+async def log_latency(
+    start_date: Optional[str] = Query(None, description="First day, YYYY-MM-DD (default: end_date)"),
+    end_date: Optional[str] = Query(None, description="Last day, YYYY-MM-DD (default: today)"),
+    bucket_minutes: int = Query(60, ge=BASE_BUCKET_MINUTES, le=1440, description=f"Bucket width, a multiple of {BASE_BUCKET_MINUTES}"),
+    route: Optional[str] = Query(None, description="Only routes containing this text, e.g. /api/tasks"),
+    token_data: TokenData = Depends(verify_token)
+):
+    """Request counts, error rates and p50/p95/p99 latency per route, from the access logs.
+
+    Routes are reported overall and per time bucket, busiest first.
+    """
+    if bucket_minutes % BASE_BUCKET_MINUTES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"bucket_minutes must be a multiple of {BASE_BUCKET_MINUTES}"
+        )
+
+    try:
+        last_day = datetime.strptime(end_date, '%Y-%m-%d') if end_date else datetime.now()
+        first_day = datetime.strptime(start_date, '%Y-%m-%d') if start_date else last_day
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format. Use YYYY-MM-DD"
+        )
+    first_day, last_day = first_day.date(), last_day.date()
+    if first_day > last_day:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date"
+        )
+    if (last_day - first_day).days >= settings.log_search_max_days:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range too wide. Use at most {settings.log_search_max_days} days"
+        )
+
+    try:
+        files = []
+        day = first_day
+        while day <= last_day:
+            log_file = find_log_file(Path("logs"), 'access', day.isoformat())
+            if log_file is not None:
+                files.append((day.isoformat(), log_file))
+            day += timedelta(days=1)
+
+        # Cached per-file partials are merged off the event loop; only new lines get parsed
+        report = await asyncio.get_running_loop().run_in_executor(
+            None, latency_report, files, bucket_minutes, route
+        )
+
+        return {
+            "start_date": first_day.isoformat(),
+            "end_date": last_day.isoformat(),
+            **report
+        }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error computing latency statistics: {str(e)}"
+        )
+
+
 @router.delete("/cleanup")
 async def cleanup_logs(
     days: int = Query(7, description="Keep logs for this many days"),
@@ -185,3 +456,31 @@ async def cleanup_logs(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error during log cleanup: {str(e)}"
         )
+
+
+def _require_profiling_admin(token_data: TokenData):
+    if token_data.user_id not in settings.profiling_admin_user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Profiles are only available to profiling admins"
+        )
+
+
+@router.get("/profiles")
+async def list_request_profiles(token_data: TokenData = Depends(verify_token)):
+    """List stored request profiles, newest first"""
+    _require_profiling_admin(token_data)
+    return {"profiles": list_profiles(), "enabled": settings.profiling_enabled}
+
+
+@router.get("/profiles/{name}")
+async def download_request_profile(name: str, token_data: TokenData = Depends(verify_token)):
+    """Download a stored profile (.pstats for pstats/snakeviz, .collapsed for flamegraph tools)"""
+    _require_profiling_admin(token_data)
+    path = find_profile(name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile not found: {name}"
+        )
+    return FileResponse(path, filename=name, media_type="application/octet-stream")
@@ -1,15 +1,43 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
+from pydantic import BaseModel, Field
+import json
 from app.models.task import TaskCreate, TaskUpdate, TaskResponse, TaskStatus, TaskSeverity, DescriptionGenerateRequest, DescriptionGenerateResponse, TagGenerateRequest, TagGenerateResponse, SearchRequest, SearchResponse, SearchResult
 from app.models.user import TokenData
 from app.services.task_service import task_service
 from app.services.ai_service import ai_service
 from app.services.search_service import search_service
+from app.services.tag_stats_service import tag_stats_service
 from app.auth.security import verify_token
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
+class DuplicateCheckRequest(BaseModel):
+    """Title and description of a task about to be created"""
+    title: str = Field(..., min_length=1, max_length=200)
+    description: str = Field(default="", max_length=5000)
+
+
+def _to_search_results(results: List[dict]) -> List[SearchResult]:
+    """Convert raw search hits to SearchResult models"""
+    search_results = []
+    for task_data in results:
+        # Remove embedding from response for performance
+        task_data.pop("embedding", None)
+
+        task = TaskResponse(**task_data)
+        search_result = SearchResult(
+            task=task,
+            similarity_score=task_data.get("similarity_score", 0.0),
+            final_score=task_data.get("final_score", 0.0)
+        )
+        search_results.append(search_result)
+    return search_results
+
+
 @router.post("/", response_model=TaskResponse)
 async def create_task(
     task_data: TaskCreate,
@@ -31,12 +59,13 @@ async def get_tasks(
     status: Optional[TaskStatus] = Query(None),
     severity: Optional[TaskSeverity] = Query(None),
     tags: Optional[str] = Query(None),
+    assigned_to: Optional[str] = Query(None),
     token_data: TokenData = Depends(verify_token)
 ):
     """Get tasks with optional filtering"""
     try:
         tag_list = tags.split(',') if tags else None
-        tasks = await task_service.get_tasks(status=status, severity=severity, tags=tag_list)
+        tasks = await task_service.get_tasks(status=status, severity=severity, tags=tag_list, assigned_to=assigned_to)
         return tasks
     except Exception as e:
         raise HTTPException(
@@ -58,46 +87,61 @@ async def get_task_stats(token_data: TokenData = Depends(verify_token)):
         )
 
 
+@router.get("/tags/facets", response_model=dict)
+async def get_tag_facets(
+    limit: int = Query(default=50, ge=1, le=500, description="Maximum number of tags"),
+    token_data: TokenData = Depends(verify_token)
+):
+    """Get task counts per tag for the filter UI"""
+    try:
+        return {"tags": tag_stats_service.get_facets(limit)}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve tag facets"
+        )
+
+
 @router.get("/search", response_model=SearchResponse)
 async def search_tasks(
     query: str = Query(..., min_length=1, max_length=500, description="Search query"),
     limit: int = Query(default=20, ge=1, le=100, description="Maximum number of results"),
     search_type: str = Query(default="intelligent", description="Type of search: keyword, semantic, hybrid, intelligent"),
+    status: Optional[TaskStatus] = Query(None, description="Only search tasks with this status"),
+    severity: Optional[TaskSeverity] = Query(None, description="Only search tasks with this severity"),
+    tags: Optional[str] = Query(None, description="Comma-separated tags; tasks with any of them match"),
+    assigned_to: Optional[str] = Query(None, description="Only search tasks assigned to this user"),
     token_data: TokenData = Depends(verify_token)
 ):
     """Search tasks using various search methods including RAG-based semantic search"""
     try:
+        filters = {
+            "status": status,
+            "severity": severity,
+            "tags": tags.split(',') if tags else None,
+            "assigned_to": assigned_to
+        }
+
         if search_type == "semantic":
-            results = await search_service.semantic_search(query, limit, user_id=token_data.user_id)
+            results = await search_service.semantic_search(query, limit, user_id=token_data.user_id, **filters)
             enhanced_query = query
             suggestions = []
         elif search_type == "keyword":
-            results = await search_service.keyword_search(query, limit, user_id=token_data.user_id)
+            results = await search_service.keyword_search(query, limit, user_id=token_data.user_id, **filters)
             enhanced_query = query
             suggestions = []
         elif search_type == "hybrid":
-            results = await search_service.hybrid_search(query, limit, user_id=token_data.user_id)
+            results = await search_service.hybrid_search(query, limit, user_id=token_data.user_id, **filters)
             enhanced_query = query
             suggestions = []
         else:  # intelligent
-            search_result = await search_service.intelligent_search(query, limit, user_id=token_data.user_id)
+            search_result = await search_service.intelligent_search(query, limit, user_id=token_data.user_id, **filters)
             results = search_result["results"]
             enhanced_query = search_result["enhanced_query"]
             suggestions = search_result["suggestions"]
 
         # Convert results to SearchResult format
-        search_results = []
-        for task_data in results:
-            # Remove embedding from response for performance
-            task_data.pop("embedding", None)
-
-            task = TaskResponse(**task_data)
-            search_result = SearchResult(
-                task=task,
-                similarity_score=task_data.get("similarity_score", 0.0),
-                final_score=task_data.get("final_score", 0.0)
-            )
-            search_results.append(search_result)
+        search_results = _to_search_results(results)
 
         return SearchResponse(
             results=search_results,
@@ -114,6 +158,60 @@ async def search_tasks(
         )
 
 
+@router.get("/search/stream")
+async def stream_search_tasks(
+    query: str = Query(..., min_length=1, max_length=500, description="Search query"),
+    limit: int = Query(default=20, ge=1, le=100, description="Maximum number of results"),
+    status: Optional[TaskStatus] = Query(None, description="Only search tasks with this status"),
+    severity: Optional[TaskSeverity] = Query(None, description="Only search tasks with this severity"),
+    tags: Optional[str] = Query(None, description="Comma-separated tags; tasks with any of them match"),
+    assigned_to: Optional[str] = Query(None, description="Only search tasks assigned to this user"),
+    token_data: TokenData = Depends(verify_token)
+):
+    """Intelligent search as Server-Sent Events: keyword, semantic, then AI-enhanced results"""
+    stages = search_service.stream_search(
+        query,
+        limit,
+        user_id=token_data.user_id,
+        status=status,
+        severity=severity,
+        tags=tags.split(',') if tags else None,
+        assigned_to=assigned_to
+    )
+
+    async def event_stream():
+        async for stage in stages:
+            if "results" in stage:
+                results = _to_search_results(stage["results"])
+                stage["results"] = results
+                stage["total_results"] = len(results)
+            yield f"event: {stage['stage']}\ndata: {json.dumps(jsonable_encoder(stage))}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/{task_id}/similar", response_model=List[SearchResult])
+async def get_similar_tasks(
+    task_id: str,
+    limit: int = Query(default=5, ge=1, le=50, description="Maximum number of similar tasks"),
+    token_data: TokenData = Depends(verify_token)
+):
+    """Get the tasks most similar to a given task, using its stored embedding"""
+    results = await search_service.find_similar_tasks(task_id, limit)
+
+    if results is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+
+    return _to_search_results(results)
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: str,
@@ -212,4 +310,19 @@ async def generate_tags(
         )
 
 
+@router.post("/duplicates", response_model=List[SearchResult])
+async def find_duplicate_tasks(
+    request: DuplicateCheckRequest,
+    limit: int = Query(default=5, ge=1, le=20, description="Maximum number of likely duplicates"),
+    token_data: TokenData = Depends(verify_token)
+):
+    """Find existing tasks that look like duplicates of a title/description before it is submitted"""
+    try:
+        results = await search_service.find_duplicate_tasks(request.title, request.description, limit)
 
+        return _to_search_results(results)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to check for duplicate tasks"
+        )
@@ -3,6 +3,9 @@ import logging
 from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, SystemMessage
 from app.core.config import settings
+from app.core.metrics import llm_request_duration, llm_request_failures
+from app.core.perf import instrument
+from app.core.request_timing import timed
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +27,17 @@ class AIService:
             except Exception as e:
                 logger.warning(f"Could not initialize ChatGroq client: {e}")
 
+    @instrument
+    async def invoke(self, messages: list, operation: str):
+        """Call the Groq model, recording latency and failures per operation"""
+        try:
+            with llm_request_duration.time(operation=operation), timed("llm"):
+                return await self.llm.ainvoke(messages)
+        except Exception:
+            llm_request_failures.inc(operation=operation)
+            raise
+
+    @instrument
     async def generate_tags(self, title: str, description: str) -> List[str]:
         """Generate tags using LangChain ChatGroq with DeepSeek model"""
         if not self.llm:
@@ -50,7 +64,7 @@ Description: "{description}"
 Tags:""")
 
             # Generate response using LangChain
-            response = await self.llm.ainvoke([system_message, human_message])
+            response = await self.invoke([system_message, human_message], "generate_tags")
             tags_text = response.content.strip()
 
             # Handle DeepSeek reasoning tokens - extract content after </think>
@@ -129,6 +143,7 @@ Tags:""")
 
         return tags[:5]  # Limit to 5 tags
 
+    @instrument
     async def generate_description(self, title: str) -> str:
         """Generate a detailed description based on task title using LangChain ChatGroq with Llama"""
         if not self.llm:
@@ -161,7 +176,7 @@ Title: "{title}"
 Description:""")
 
             # Generate response using LangChain
-            response = await self.llm.ainvoke([system_message, human_message])
+            response = await self.invoke([system_message, human_message], "generate_description")
             description = response.content.strip()
 
             # Handle DeepSeek reasoning tokens - extract content after </think>
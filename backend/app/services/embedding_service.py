@@ -6,6 +6,9 @@ from sklearn.metrics.pairwise import cosine_similarity
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 import json
+from app.core.metrics import embedding_encode_duration, embedding_batch_size, queue_depth
+from app.core.perf import instrument
+from app.core.request_timing import timed
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +17,7 @@ class EmbeddingService:
     def __init__(self):
         self.model = None
         self.executor = ThreadPoolExecutor(max_workers=2)
+        queue_depth.set_function(self.executor._work_queue.qsize, queue="embedding")
         self._initialize_model()
 
     def _initialize_model(self):
@@ -26,6 +30,7 @@ class EmbeddingService:
             logger.error(f"Failed to initialize SentenceTransformer model: {e}")
             self.model = None
 
+    @instrument
     async def generate_task_embedding(self, title: str, description: str, tags: List[str]) -> Optional[List[float]]:
         """Generate embedding for a task combining title, description, and tags"""
         if not self.model:
@@ -38,11 +43,12 @@ class EmbeddingService:
             
             # Generate embedding asynchronously
             loop = asyncio.get_event_loop()
-            embedding = await loop.run_in_executor(
-                self.executor, 
-                self._generate_embedding_sync, 
-                combined_text
-            )
+            with timed("embed"):
+                embedding = await loop.run_in_executor(
+                    self.executor, 
+                    self._generate_embedding_sync, 
+                    combined_text
+                )
             
             return embedding.tolist() if embedding is not None else None
             
@@ -80,13 +86,16 @@ class EmbeddingService:
             if not text.strip():
                 return None
             
-            embedding = self.model.encode(text, convert_to_tensor=False)
+            with embedding_encode_duration.time(kind="single"):
+                embedding = self.model.encode(text, convert_to_tensor=False)
+            embedding_batch_size.observe(1)
             return embedding
             
         except Exception as e:
             logger.error(f"Error in synchronous embedding generation: {e}")
             return None
 
+    @instrument
     async def generate_query_embedding(self, query: str) -> Optional[List[float]]:
         """Generate embedding for a search query"""
         if not self.model:
@@ -101,11 +110,12 @@ class EmbeddingService:
             
             # Generate embedding asynchronously
             loop = asyncio.get_event_loop()
-            embedding = await loop.run_in_executor(
-                self.executor, 
-                self._generate_embedding_sync, 
-                clean_query
-            )
+            with timed("embed"):
+                embedding = await loop.run_in_executor(
+                    self.executor, 
+                    self._generate_embedding_sync, 
+                    clean_query
+                )
             
             return embedding.tolist() if embedding is not None else None
             
@@ -131,6 +141,7 @@ class EmbeddingService:
             logger.error(f"Error calculating similarity: {e}")
             return 0.0
 
+    @instrument
     async def batch_generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
         """Generate embeddings for multiple texts in batch"""
         if not self.model:
@@ -146,11 +157,12 @@ class EmbeddingService:
             
             # Generate embeddings in batch
             loop = asyncio.get_event_loop()
-            embeddings = await loop.run_in_executor(
-                self.executor,
-                self._batch_generate_embeddings_sync,
-                [text for _, text in valid_texts]
-            )
+            with timed("embed"):
+                embeddings = await loop.run_in_executor(
+                    self.executor,
+                    self._batch_generate_embeddings_sync,
+                    [text for _, text in valid_texts]
+                )
             
             # Map results back to original positions
             results = [None] * len(texts)
@@ -166,7 +178,9 @@ class EmbeddingService:
     def _batch_generate_embeddings_sync(self, texts: List[str]) -> List[Optional[np.ndarray]]:
         """Synchronous batch embedding generation"""
         try:
-            embeddings = self.model.encode(texts, convert_to_tensor=False, batch_size=8)
+            with embedding_encode_duration.time(kind="batch"):
+                embeddings = self.model.encode(texts, convert_to_tensor=False, batch_size=8)
+            embedding_batch_size.observe(len(texts))
             return [emb for emb in embeddings]
         except Exception as e:
             logger.error(f"Error in synchronous batch embedding generation: {e}")
@@ -1,12 +1,23 @@
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
+import asyncio
+import heapq
 import logging
 import re
+import time
 from datetime import datetime
+import numpy as np
 from bson import ObjectId
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import search_stage_duration, queue_depth
+from app.core.perf import instrument
+from app.core.request_timing import timed
 from app.database.connection import get_database
 from app.services.embedding_service import embedding_service
 from app.services.ai_service import ai_service
-from app.models.task import TaskResponse
+from app.services.tag_stats_service import tag_stats_service
+from app.services.vector_index import vector_index, top_k_indices, near_duplicate_pairs, cluster_pairs
+from app.models.task import TaskResponse, TaskStatus, TaskSeverity
 from langchain_core.messages import HumanMessage, SystemMessage
 
 logger = logging.getLogger(__name__)
@@ -16,6 +27,14 @@ class SearchService:
     def __init__(self):
         self.db = None
         self.collection = None
+        # Enhanced queries keyed by normalized query text
+        self._enhancement_cache = TTLCache(
+            maxsize=settings.search_enhancement_cache_size,
+            ttl=settings.search_enhancement_cache_ttl
+        )
+        # In-flight enhancement tasks, so concurrent searches share one LLM call
+        self._pending_enhancements: Dict[str, asyncio.Task] = {}
+        queue_depth.set_function(self._pending_enhancements.__len__, queue="query_enhancement")
 
     def _get_collection(self):
         if self.collection is None:
@@ -23,63 +42,286 @@ class SearchService:
             self.collection = self.db.tasks
         return self.collection
 
+    def _build_filter_query(
+        self,
+        user_id: Optional[str] = None,
+        status: Optional[TaskStatus] = None,
+        severity: Optional[TaskSeverity] = None,
+        tags: Optional[List[str]] = None,
+        assigned_to: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the MongoDB filter shared by every search type (same semantics as get_tasks)"""
+        query = {}
+        if user_id:
+            query["created_by"] = user_id
+        if status:
+            query["status"] = status
+        if severity:
+            query["severity"] = severity
+        if tags:
+            query["tags"] = {"$in": tags}
+        if assigned_to:
+            query["assigned_to"] = assigned_to
+        return query
+
+    def _hydrate_scored_tasks(self, scored: List[Tuple[str, float]]) -> List[Dict[str, Any]]:
+        """Fetch task documents for (task_id, score) pairs, preserving order"""
+        if not scored:
+            return []
+
+        collection = self._get_collection()
+        object_ids = [ObjectId(task_id) for task_id, _ in scored]
+        documents = {
+            str(task["_id"]): task
+            for task in collection.find({"_id": {"$in": object_ids}}, {"embedding": 0})
+        }
+
+        tasks = []
+        for task_id, score in scored:
+            task = documents.get(task_id)
+            if task:
+                task["_id"] = task_id
+                task["similarity_score"] = score
+                tasks.append(task)
+        return tasks
+
+    @instrument
     async def semantic_search(
         self, 
         query: str, 
         limit: int = 20,
         similarity_threshold: float = 0.3,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        status: Optional[TaskStatus] = None,
+        severity: Optional[TaskSeverity] = None,
+        tags: Optional[List[str]] = None,
+        assigned_to: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Perform semantic search using embeddings"""
+        """Perform semantic search using embeddings, optionally within filtered tasks"""
+        filters = {"status": status, "severity": severity, "tags": tags, "assigned_to": assigned_to}
         try:
             # Generate query embedding
-            query_embedding = await embedding_service.generate_query_embedding(query)
+            with search_stage_duration.time(stage="embed"):
+                query_embedding = await embedding_service.generate_query_embedding(query)
             if not query_embedding:
                 logger.warning("Could not generate query embedding, falling back to keyword search")
-                return await self.keyword_search(query, limit, user_id)
+                return await self.keyword_search(query, limit, user_id, **filters)
+
+            # Filters are applied as row masks before any vector is scored
+            if vector_index.is_ready():
+                with search_stage_duration.time(stage="vector_index"), timed("vector"):
+                    scored = vector_index.search(
+                        query_embedding,
+                        limit,
+                        similarity_threshold,
+                        created_by=user_id,
+                        **filters
+                    )
+            else:
+                # No index resident: stream the vectors through a bounded top-k scorer
+                filter_query = self._build_filter_query(user_id, **filters)
+                with search_stage_duration.time(stage="vector_scan"), timed("vector"):
+                    scored = await asyncio.get_running_loop().run_in_executor(
+                        None,
+                        self._score_stored_embeddings,
+                        query_embedding,
+                        limit,
+                        similarity_threshold,
+                        filter_query
+                    )
 
-            # Get all tasks with embeddings
-            collection = self._get_collection()
-            
-            # Build base query
-            base_query = {"embedding": {"$exists": True, "$ne": None}}
-            if user_id:
-                base_query["created_by"] = user_id
+            with search_stage_duration.time(stage="hydrate"):
+                return self._hydrate_scored_tasks(scored)
 
-            tasks = list(collection.find(base_query))
-            
-            if not tasks:
+        except Exception as e:
+            logger.error(f"Error in semantic search: {e}")
+            return await self.keyword_search(query, limit, user_id, **filters)
+
+    def _score_stored_embeddings(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        similarity_threshold: float = 0.0,
+        filter_query: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, float]]:
+        """Score stored task vectors without an index, in bounded memory.
+
+        Only _id and embedding are read, in fixed-size cursor batches. Each
+        batch is scored with one matrix product and folded into a running
+        top-k heap, so memory is O(limit + batch) rather than O(corpus).
+        """
+        collection = self._get_collection()
+        base_query = {"embedding": {"$exists": True, "$ne": None}}
+        base_query.update(filter_query or {})
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0 or limit <= 0:
+            return []
+        query = query / query_norm
+
+        batch_size = settings.semantic_scan_batch_size
+        top: List[Tuple[float, str]] = []  # min-heap of (score, task_id)
+
+        def score_batch(ids: List[str], vectors: List[List[float]]):
+            matrix = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1)
+            scores = (matrix @ query) / np.where(norms == 0, 1, norms)
+
+            passing = np.flatnonzero(scores >= similarity_threshold)
+            for i in passing[top_k_indices(scores[passing], limit)]:
+                entry = (float(scores[i]), ids[i])
+                if len(top) < limit:
+                    heapq.heappush(top, entry)
+                elif entry > top[0]:
+                    heapq.heapreplace(top, entry)
+
+        ids: List[str] = []
+        vectors: List[List[float]] = []
+        for task in collection.find(base_query, {"embedding": 1}, batch_size=batch_size):
+            ids.append(str(task["_id"]))
+            vectors.append(task["embedding"])
+            if len(ids) == batch_size:
+                score_batch(ids, vectors)
+                ids, vectors = [], []
+        if ids:
+            score_batch(ids, vectors)
+
+        return [(task_id, score) for score, task_id in sorted(top, reverse=True)]
+
+    async def _search_by_embedding(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        similarity_threshold: float = 0.0,
+        exclude_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Nearest tasks to an existing vector, from the index when it is resident"""
+        if vector_index.is_ready():
+            with search_stage_duration.time(stage="vector_index"), timed("vector"):
+                scored = vector_index.search(
+                    query_embedding,
+                    limit,
+                    similarity_threshold,
+                    exclude_ids=[exclude_id] if exclude_id else None
+                )
+        else:
+            # Full scan of the stored vectors: keep it off the event loop
+            filter_query = {"_id": {"$ne": ObjectId(exclude_id)}} if exclude_id else None
+            with search_stage_duration.time(stage="vector_scan"), timed("vector"):
+                scored = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    self._score_stored_embeddings,
+                    query_embedding,
+                    limit,
+                    similarity_threshold,
+                    filter_query
+                )
+        tasks = self._hydrate_scored_tasks(scored)
+        # Ranked on similarity alone, so it is also the final score
+        for task in tasks:
+            task["final_score"] = task["similarity_score"]
+        return tasks
+
+    @instrument
+    async def find_similar_tasks(self, task_id: str, limit: int = 5) -> Optional[List[Dict[str, Any]]]:
+        """Find the nearest neighbours of a task using its stored embedding.
+
+        Returns None if the task does not exist. Nothing is re-encoded: the
+        task's vector comes from the index or, failing that, its document.
+        """
+        try:
+            object_id = ObjectId(task_id)
+        except Exception:
+            return None
+
+        embedding = vector_index.get_vector(task_id) if vector_index.is_ready() else None
+        if embedding is None:
+            task = self._get_collection().find_one({"_id": object_id}, {"embedding": 1})
+            if not task:
+                return None
+            embedding = task.get("embedding")
+            if not embedding:
                 return []
 
-            # Calculate similarities
-            scored_tasks = []
-            for task in tasks:
-                if "embedding" in task and task["embedding"]:
-                    similarity = embedding_service.calculate_similarity(
-                        query_embedding, 
-                        task["embedding"]
-                    )
-                    
-                    if similarity >= similarity_threshold:
-                        task["_id"] = str(task["_id"])
-                        task["similarity_score"] = similarity
-                        scored_tasks.append(task)
-
-            # Sort by similarity score (descending)
-            scored_tasks.sort(key=lambda x: x["similarity_score"], reverse=True)
-            
-            # Return top results
-            return scored_tasks[:limit]
+        return await self._search_by_embedding(embedding, limit, exclude_id=task_id)
 
-        except Exception as e:
-            logger.error(f"Error in semantic search: {e}")
-            return await self.keyword_search(query, limit, user_id)
+    @instrument
+    async def find_duplicate_tasks(
+        self,
+        title: str,
+        description: str,
+        limit: int = 5,
+        similarity_threshold: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Find existing tasks that are likely duplicates of a task about to be created"""
+        if similarity_threshold is None:
+            similarity_threshold = settings.duplicate_similarity_threshold
+
+        embedding = await embedding_service.generate_task_embedding(title, description, [])
+        if not embedding:
+            return []
 
+        return await self._search_by_embedding(embedding, limit, similarity_threshold)
+
+    @instrument
+    def find_duplicate_clusters(
+        self,
+        similarity_threshold: Optional[float] = None,
+        created_by: Optional[str] = None,
+        block_size: int = 1024
+    ) -> List[List[str]]:
+        """Group all near-duplicate tasks into clusters of task ids.
+
+        Pairs are found with blocked matrix products over the normalized
+        embeddings, so memory stays at block_size x n scores at a time.
+        """
+        if similarity_threshold is None:
+            similarity_threshold = settings.duplicate_similarity_threshold
+
+        collection = self._get_collection()
+        base_query = {"embedding": {"$exists": True, "$ne": None}}
+        if created_by:
+            base_query["created_by"] = created_by
+
+        # Fill a preallocated float32 matrix row by row, so the corpus never
+        # exists as Python float lists
+        capacity = collection.count_documents(base_query)
+        if capacity < 2:
+            return []
+        ids: List[str] = []
+        matrix: Optional[np.ndarray] = None
+        for task in collection.find(base_query, {"embedding": 1}, batch_size=5000):
+            vector = np.asarray(task["embedding"], dtype=np.float32)
+            if matrix is None:
+                matrix = np.empty((capacity, vector.shape[0]), dtype=np.float32)
+            elif vector.shape[0] != matrix.shape[1]:
+                logger.warning(f"Skipping task {task['_id']}: embedding dimension {vector.shape[0]} != {matrix.shape[1]}")
+                continue
+            if len(ids) == capacity:
+                # Tasks inserted since counting: grow instead of dropping them
+                capacity += max(1024, capacity // 4)
+                matrix = np.resize(matrix, (capacity, matrix.shape[1]))
+            matrix[len(ids)] = vector
+            ids.append(str(task["_id"]))
+
+        if len(ids) < 2:
+            return []
+
+        matrix = matrix[:len(ids)]
+        pairs = near_duplicate_pairs(matrix, similarity_threshold, block_size)
+        return [[ids[i] for i in cluster] for cluster in cluster_pairs(pairs, len(ids))]
+
+    @instrument
     async def keyword_search(
         self, 
         query: str, 
         limit: int = 20,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        status: Optional[TaskStatus] = None,
+        severity: Optional[TaskSeverity] = None,
+        tags: Optional[List[str]] = None,
+        assigned_to: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Perform traditional keyword search as fallback"""
         try:
@@ -101,12 +343,13 @@ class SearchService:
                     {"tags": {"$in": search_terms}}
                 ]
             }
-            
-            if user_id:
-                search_query["created_by"] = user_id
+            filter_query = self._build_filter_query(user_id, status, severity, tags, assigned_to)
+            if filter_query:
+                search_query = {"$and": [search_query, filter_query]}
 
             # Execute search
-            tasks = list(collection.find(search_query).sort("created_at", -1).limit(limit))
+            with search_stage_duration.time(stage="keyword"):
+                tasks = list(collection.find(search_query).sort("created_at", -1).limit(limit))
             
             # Convert ObjectId to string and add basic relevance scoring
             for task in tasks:
@@ -147,66 +390,97 @@ class SearchService:
         
         return score
 
+    @instrument
     async def hybrid_search(
         self, 
         query: str, 
         limit: int = 20,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        status: Optional[TaskStatus] = None,
+        severity: Optional[TaskSeverity] = None,
+        tags: Optional[List[str]] = None,
+        assigned_to: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Combine semantic and keyword search for best results"""
+        filters = {"status": status, "severity": severity, "tags": tags, "assigned_to": assigned_to}
         try:
             # Perform both searches
-            semantic_results = await self.semantic_search(query, limit * 2, 0.2, user_id)
-            keyword_results = await self.keyword_search(query, limit * 2, user_id)
-            
-            # Combine and deduplicate results
-            combined_results = {}
+            semantic_results = await self.semantic_search(query, limit * 2, 0.2, user_id, **filters)
+            keyword_results = await self.keyword_search(query, limit * 2, user_id, **filters)
             
-            # Add semantic results with higher weight
-            for task in semantic_results:
-                task_id = task["_id"]
-                task["final_score"] = task.get("similarity_score", 0) * 0.7  # 70% weight
-                combined_results[task_id] = task
-            
-            # Add keyword results with lower weight, boost if already exists
-            for task in keyword_results:
-                task_id = task["_id"]
-                keyword_score = task.get("similarity_score", 0) * 0.3  # 30% weight
-                
-                if task_id in combined_results:
-                    # Boost existing result
-                    combined_results[task_id]["final_score"] += keyword_score
-                else:
-                    # Add new result
-                    task["final_score"] = keyword_score
-                    combined_results[task_id] = task
-            
-            # Sort by final score and return top results
-            final_results = list(combined_results.values())
-            final_results.sort(key=lambda x: x.get("final_score", 0), reverse=True)
-            
-            return final_results[:limit]
+            return self._combine_results(semantic_results, keyword_results, limit)
 
         except Exception as e:
             logger.error(f"Error in hybrid search: {e}")
-            return await self.keyword_search(query, limit, user_id)
+            return await self.keyword_search(query, limit, user_id, **filters)
 
+    def _combine_results(
+        self,
+        semantic_results: List[Dict[str, Any]],
+        keyword_results: List[Dict[str, Any]],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Merge semantic and keyword hits into one weighted ranking"""
+        combined_results = {}
+        
+        # Add semantic results with higher weight
+        for task in semantic_results:
+            task_id = task["_id"]
+            task["final_score"] = task.get("similarity_score", 0) * 0.7  # 70% weight
+            combined_results[task_id] = task
+        
+        # Add keyword results with lower weight, boost if already exists
+        for task in keyword_results:
+            task_id = task["_id"]
+            keyword_score = task.get("similarity_score", 0) * 0.3  # 30% weight
+            
+            if task_id in combined_results:
+                # Boost existing result
+                combined_results[task_id]["final_score"] += keyword_score
+            else:
+                # Add new result
+                task["final_score"] = keyword_score
+                combined_results[task_id] = task
+        
+        # Sort by final score and return top results
+        final_results = list(combined_results.values())
+        final_results.sort(key=lambda x: x.get("final_score", 0), reverse=True)
+        
+        return final_results[:limit]
+
+    @instrument
     async def intelligent_search(
         self, 
         query: str, 
         limit: int = 20,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        status: Optional[TaskStatus] = None,
+        severity: Optional[TaskSeverity] = None,
+        tags: Optional[List[str]] = None,
+        assigned_to: Optional[str] = None
     ) -> Dict[str, Any]:
         """AI-enhanced search with query understanding and suggestions"""
+        filters = {"status": status, "severity": severity, "tags": tags, "assigned_to": assigned_to}
         try:
-            # Enhance query using AI
-            enhanced_query = await self._enhance_query_with_ai(query)
-            
-            # Perform hybrid search
-            results = await self.hybrid_search(enhanced_query, limit, user_id)
+            cached_query = self._enhancement_cache.get(self._enhancement_key(query))
+            if cached_query is not None:
+                enhanced_query = cached_query
+                results = await self.hybrid_search(enhanced_query, limit, user_id, **filters)
+            else:
+                # Start retrieval with the raw query while the LLM is thinking;
+                # it becomes the answer if enhancement misses its deadline
+                raw_search = asyncio.create_task(self.hybrid_search(query, limit, user_id, **filters))
+                enhanced_query = await self._get_enhanced_query(query)
+
+                if enhanced_query == query:
+                    results = await raw_search
+                else:
+                    raw_search.cancel()
+                    results = await self.hybrid_search(enhanced_query, limit, user_id, **filters)
             
             # Generate search suggestions
-            suggestions = await self._generate_search_suggestions(query, results)
+            with search_stage_duration.time(stage="suggestions"):
+                suggestions = await self._generate_search_suggestions(query, results)
             
             return {
                 "results": results,
@@ -218,7 +492,7 @@ class SearchService:
         except Exception as e:
             logger.error(f"Error in intelligent search: {e}")
             # Fallback to basic hybrid search
-            results = await self.hybrid_search(query, limit, user_id)
+            results = await self.hybrid_search(query, limit, user_id, **filters)
             return {
                 "results": results,
                 "enhanced_query": query,
@@ -226,6 +500,113 @@ class SearchService:
                 "total_results": len(results)
             }
 
+    async def stream_search(
+        self,
+        query: str,
+        limit: int = 20,
+        user_id: Optional[str] = None,
+        status: Optional[TaskStatus] = None,
+        severity: Optional[TaskSeverity] = None,
+        tags: Optional[List[str]] = None,
+        assigned_to: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Intelligent search that yields each stage's results as soon as it is ready.
+
+        Stages arrive as keyword, semantic, then intelligent (AI-enhanced
+        re-ranking plus suggestions). Each carries its own duration and the
+        time elapsed since the search started, in milliseconds.
+        """
+        filters = {"status": status, "severity": severity, "tags": tags, "assigned_to": assigned_to}
+        search_start = time.perf_counter()
+
+        def stage(name: str, stage_start: float, **payload) -> Dict[str, Any]:
+            now = time.perf_counter()
+            search_stage_duration.observe(now - stage_start, stage=f"stream_{name}")
+            return {
+                "stage": name,
+                "duration_ms": round((now - stage_start) * 1000, 1),
+                "elapsed_ms": round((now - search_start) * 1000, 1),
+                **payload
+            }
+
+        # The LLM is the slowest stage, so it starts first and runs alongside retrieval
+        cached_query = self._enhancement_cache.get(self._enhancement_key(query))
+        enhancement = None
+        if cached_query is None and ai_service.llm:
+            enhancement = self._start_enhancement(query)
+
+        try:
+            stage_start = time.perf_counter()
+            keyword_results = await self.keyword_search(query, limit * 2, user_id, **filters)
+            yield stage("keyword", stage_start, results=keyword_results[:limit])
+
+            stage_start = time.perf_counter()
+            semantic_results = await self.semantic_search(query, limit * 2, 0.2, user_id, **filters)
+            yield stage("semantic", stage_start, results=semantic_results[:limit])
+
+            stage_start = time.perf_counter()
+            enhanced_query = cached_query or query
+            if enhancement is not None:
+                try:
+                    enhanced_query = await asyncio.shield(enhancement)
+                except Exception as e:
+                    logger.error(f"Error enhancing query with AI: {e}")
+
+            if enhanced_query == query:
+                results = self._combine_results(semantic_results, keyword_results, limit)
+            else:
+                results = await self.hybrid_search(enhanced_query, limit, user_id, **filters)
+
+            suggestions = await self._generate_search_suggestions(query, results)
+            yield stage(
+                "intelligent",
+                stage_start,
+                results=results,
+                enhanced_query=enhanced_query,
+                suggestions=suggestions
+            )
+        except Exception as e:
+            logger.error(f"Error in streaming search: {e}")
+            yield stage("error", search_start, detail="Search failed")
+
+    def _enhancement_key(self, query: str) -> str:
+        """Normalize a query for the enhancement cache"""
+        return " ".join(query.lower().split())
+
+    def _start_enhancement(self, query: str) -> asyncio.Task:
+        """Return the in-flight LLM enhancement for a query, starting it if needed"""
+        key = self._enhancement_key(query)
+        pending = self._pending_enhancements.get(key)
+        if pending is None:
+            pending = asyncio.create_task(self._enhance_query_with_ai(query))
+            self._pending_enhancements[key] = pending
+            pending.add_done_callback(lambda _: self._pending_enhancements.pop(key, None))
+        return pending
+
+    async def _get_enhanced_query(self, query: str) -> str:
+        """Return the AI-enhanced query, or the raw query if the LLM misses its deadline.
+
+        A late enhancement keeps running in the background and lands in the
+        cache, so the next search for the same query gets it for free.
+        """
+        if not ai_service.llm:
+            return query
+
+        cached = self._enhancement_cache.get(self._enhancement_key(query))
+        if cached is not None:
+            return cached
+
+        pending = self._start_enhancement(query)
+        try:
+            with search_stage_duration.time(stage="enhance_wait"), timed("enhance"):
+                return await asyncio.wait_for(
+                    asyncio.shield(pending),
+                    timeout=settings.search_enhancement_timeout
+                )
+        except asyncio.TimeoutError:
+            logger.info(f"Query enhancement exceeded {settings.search_enhancement_timeout}s, using raw query")
+            return query
+
     async def _enhance_query_with_ai(self, query: str) -> str:
         """Use AI to enhance and expand the search query"""
         if not ai_service.llm:
@@ -249,14 +630,15 @@ Original query: "{query}"
 
 Enhanced query:""")
 
-            response = await ai_service.llm.ainvoke([system_message, human_message])
+            response = await ai_service.invoke([system_message, human_message], "enhance_query")
             enhanced = response.content.strip()
             
             # Clean up the response
-            if enhanced and len(enhanced) > 0 and len(enhanced) < 200:
-                return enhanced
-            else:
-                return query
+            if not (enhanced and len(enhanced) > 0 and len(enhanced) < 200):
+                enhanced = query
+
+            self._enhancement_cache.set(self._enhancement_key(query), enhanced)
+            return enhanced
 
         except Exception as e:
             logger.error(f"Error enhancing query with AI: {e}")
@@ -267,30 +649,30 @@ Enhanced query:""")
         original_query: str, 
         results: List[Dict[str, Any]]
     ) -> List[str]:
-        """Generate search suggestions based on results"""
+        """Generate search suggestions from corpus-wide tag statistics"""
         suggestions = []
         
         try:
-            # Extract common tags from results
-            tag_frequency = {}
-            for task in results[:10]:  # Only look at top 10 results
+            query_lower = original_query.lower()
+            scores = {}
+
+            # Share of the top results carrying each tag
+            top_results = results[:10]
+            for task in top_results:
                 for tag in task.get("tags", []):
-                    tag_frequency[tag] = tag_frequency.get(tag, 0) + 1
-            
-            # Get most common tags as suggestions
-            common_tags = sorted(tag_frequency.items(), key=lambda x: x[1], reverse=True)
-            for tag, _ in common_tags[:5]:
-                if tag.lower() not in original_query.lower():
+                    scores[tag] = scores.get(tag, 0.0) + 1.0 / len(top_results)
+
+            # How often each tag accompanies the query's own tags across all tasks
+            query_tags = tag_stats_service.match_tags(query_lower.split())
+            for tag, score in tag_stats_service.get_related_tags(query_tags).items():
+                scores[tag] = scores.get(tag, 0.0) + score
+
+            ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+            for tag, _ in ranked:
+                if tag.lower() not in query_lower:
                     suggestions.append(tag)
-            
-            # Add some predefined suggestions based on query content
-            query_lower = original_query.lower()
-            if "bug" in query_lower and "critical" not in query_lower:
-                suggestions.append("critical")
-            if "feature" in query_lower and "enhancement" not in query_lower:
-                suggestions.append("enhancement")
-            if "ui" in query_lower and "frontend" not in query_lower:
-                suggestions.append("frontend")
+                if len(suggestions) == 5:
+                    break
             
         except Exception as e:
             logger.error(f"Error generating search suggestions: {e}")
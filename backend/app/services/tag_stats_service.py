@@ -0,0 +1,270 @@
+from typing import AbstractSet, List, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from itertools import combinations
+import logging
+import os
+import socket
+import time
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.database.connection import get_database
+
+logger = logging.getLogger(__name__)
+
+PAIR_SEPARATOR = "\t"
+REBUILD_LOCK_TTL = 600  # seconds without progress before another worker may take over a rebuild
+REBUILD_SETTLE_TIME = 5  # seconds the journal stays open after the scan, for writes still being recorded
+
+
+def _pair_key(tag_a: str, tag_b: str) -> str:
+    first, second = sorted((tag_a, tag_b))
+    return f"{first}{PAIR_SEPARATOR}{second}"
+
+
+def _add_change(tag_deltas: Counter, pair_deltas: Counter, old_tags: AbstractSet[str], new_tags: AbstractSet[str]):
+    """Add the counter deltas of a task whose tags went from old_tags to new_tags"""
+    for tag in new_tags - old_tags:
+        tag_deltas[tag] += 1
+    for tag in old_tags - new_tags:
+        tag_deltas[tag] -= 1
+
+    old_pairs = {_pair_key(a, b) for a, b in combinations(old_tags, 2)}
+    new_pairs = {_pair_key(a, b) for a, b in combinations(new_tags, 2)}
+    for pair in new_pairs - old_pairs:
+        pair_deltas[pair] += 1
+    for pair in old_pairs - new_pairs:
+        pair_deltas[pair] -= 1
+
+
+class TagStatsService:
+    """Corpus-wide tag counts and tag co-occurrence counts.
+
+    Counters live in MongoDB (tag_counts, tag_pairs) and are adjusted with
+    $inc on every task write, so all workers share them and reads never
+    aggregate over tasks. Reads go through a short-lived in-process snapshot,
+    so a worker sees changes at most tag_stats_cache_ttl seconds late.
+    """
+
+    def __init__(self):
+        self.db = None
+        self._snapshot_cache = TTLCache(maxsize=1, ttl=settings.tag_stats_cache_ttl)
+        self._owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    def _get_db(self):
+        if self.db is None:
+            self.db = get_database()
+        return self.db
+
+    @staticmethod
+    def _apply_deltas(tag_collection, pair_collection, tag_deltas: Counter, pair_deltas: Counter):
+        for collection, deltas in ((tag_collection, tag_deltas), (pair_collection, pair_deltas)):
+            deltas = {key: delta for key, delta in deltas.items() if delta}
+            if not deltas:
+                continue
+            collection.bulk_write(
+                [UpdateOne({"_id": key}, {"$inc": {"count": delta}}, upsert=True) for key, delta in deltas.items()],
+                ordered=False
+            )
+            decreased = [key for key, delta in deltas.items() if delta < 0]
+            if decreased:
+                collection.delete_many({"_id": {"$in": decreased}, "count": {"$lte": 0}})
+
+    def record_tag_change(self, task_id: str, old_tags: Iterable[str], new_tags: Iterable[str]):
+        """Apply the counter deltas for a task whose tags went from old_tags to new_tags"""
+        old_tags = set(old_tags or ())
+        new_tags = set(new_tags or ())
+        if old_tags == new_tags:
+            return
+
+        try:
+            db = self._get_db()
+            # While a rebuild runs it owns the counters: the change goes into its
+            # journal, and the rebuild applies it exactly once
+            journaled = db.tag_stats_meta.update_one(
+                {"_id": "rebuild", "expires_at": {"$gt": datetime.utcnow()}},
+                {"$push": {"journal": {"task_id": task_id, "old": sorted(old_tags), "new": sorted(new_tags)}}}
+            )
+            if journaled.matched_count:
+                return
+
+            tag_deltas = Counter()
+            pair_deltas = Counter()
+            _add_change(tag_deltas, pair_deltas, old_tags, new_tags)
+            self._apply_deltas(db.tag_counts, db.tag_pairs, tag_deltas, pair_deltas)
+        except Exception as e:
+            logger.error(f"Failed to update tag statistics: {e}")
+
+    def ensure_built(self):
+        """Build the counters from existing tasks if they have never been built"""
+        try:
+            db = self._get_db()
+            if db.tag_stats_meta.find_one({"_id": "built"}) is None:
+                self.rebuild()
+        except Exception as e:
+            logger.error(f"Failed to build tag statistics: {e}")
+
+    def _acquire_rebuild_lock(self, db) -> bool:
+        now = datetime.utcnow()
+        lock = {"owner": self._owner, "expires_at": now + timedelta(seconds=REBUILD_LOCK_TTL), "journal": []}
+        try:
+            db.tag_stats_meta.insert_one({"_id": "rebuild", **lock})
+            return True
+        except DuplicateKeyError:
+            # Held by another worker, unless it stopped making progress; its
+            # journal is dropped, as the new scan sees those changes anyway
+            taken = db.tag_stats_meta.update_one({"_id": "rebuild", "expires_at": {"$lt": now}}, {"$set": lock})
+            return taken.modified_count == 1
+
+    def _drain_journal(self, db) -> Optional[List[dict]]:
+        """Take the changes journaled since the last call and extend the lock; None if the lock was taken over"""
+        lock = db.tag_stats_meta.find_one_and_update(
+            {"_id": "rebuild", "owner": self._owner},
+            {"$set": {"journal": [], "expires_at": datetime.utcnow() + timedelta(seconds=REBUILD_LOCK_TTL)}},
+            projection={"journal": 1}
+        )
+        return None if lock is None else lock.get("journal", [])
+
+    def _apply_journal(self, tag_collection, pair_collection, entries: List[dict],
+                       seen: Optional[Dict[str, FrozenSet[str]]], journaled: Set[str]):
+        """Apply journaled changes on top of the scanned tags.
+
+        The scan may have read a task before or after a journaled change, so
+        the first change of each task is counted from the tags the scan saw
+        (none if it has not reached the task yet) and the scan skips the task
+        from then on; later changes apply their own deltas. With seen=None
+        every change applies its own delta.
+        """
+        tag_deltas = Counter()
+        pair_deltas = Counter()
+        for entry in entries:
+            task_id = entry["task_id"]
+            if seen is not None and task_id not in journaled:
+                old_tags = seen.get(task_id, frozenset())
+                journaled.add(task_id)
+            else:
+                old_tags = entry["old"]
+            _add_change(tag_deltas, pair_deltas, set(old_tags), set(entry["new"]))
+        self._apply_deltas(tag_collection, pair_collection, tag_deltas, pair_deltas)
+
+    def rebuild(self, batch_size: int = 5000) -> bool:
+        """Recount every tag and tag pair from the tasks collection.
+
+        One worker at a time holds the rebuild lock; the others return False
+        at once. Counts go into staging collections, which then replace the
+        live ones by rename, so readers never see partial counts. Task writes
+        made meanwhile are journaled in the lock instead of touching the live
+        counters, and are applied after each page, so each is counted once.
+        Keeps the tags of every scanned task in memory until it finishes.
+        """
+        db = self._get_db()
+        if not self._acquire_rebuild_lock(db):
+            logger.info("Tag statistics rebuild already running in another worker")
+            return False
+
+        start_time = time.time()
+        seen: Dict[str, FrozenSet[str]] = {}
+        journaled: Set[str] = set()
+        drained: List[dict] = []
+        swapped = False
+        try:
+            db.tag_counts_rebuild.drop()
+            db.tag_pairs_rebuild.drop()
+            db.create_collection("tag_counts_rebuild")
+            db.create_collection("tag_pairs_rebuild")
+
+            query = {"tags.0": {"$exists": True}}
+            while True:
+                page = list(db.tasks.find(query, {"tags": 1}).sort("_id", ASCENDING).limit(batch_size))
+                tag_counts = Counter()
+                pair_counts = Counter()
+                for task in page:
+                    task_id = str(task["_id"])
+                    if task_id in journaled:
+                        # Already counted from its journaled changes
+                        continue
+                    tags = frozenset(task["tags"])
+                    seen[task_id] = tags
+                    _add_change(tag_counts, pair_counts, set(), tags)
+                self._apply_deltas(db.tag_counts_rebuild, db.tag_pairs_rebuild, tag_counts, pair_counts)
+
+                entries = self._drain_journal(db)
+                if entries is None:
+                    logger.warning("Tag statistics rebuild lock taken over; abandoning this rebuild")
+                    return False
+                drained.extend(entries)
+                self._apply_journal(db.tag_counts_rebuild, db.tag_pairs_rebuild, entries, seen, journaled)
+                if not page:
+                    break
+                query = {"_id": {"$gt": page[-1]["_id"]}, "tags.0": {"$exists": True}}
+
+            # A task written before the scan read it may not have been recorded
+            # yet; if it is recorded while the journal is open, it is counted once
+            time.sleep(REBUILD_SETTLE_TIME)
+            db.tag_counts_rebuild.rename("tag_counts", dropTarget=True)
+            db.tag_pairs_rebuild.rename("tag_pairs", dropTarget=True)
+            swapped = True
+            db.tag_stats_meta.update_one({"_id": "built"}, {"$set": {"at": datetime.utcnow()}}, upsert=True)
+        finally:
+            # Changes journaled since the last drain go on top of the swapped-in
+            # counts; if the rebuild failed, every journaled change goes to the
+            # untouched live counters as a plain delta
+            lock = db.tag_stats_meta.find_one_and_delete({"_id": "rebuild", "owner": self._owner})
+            remaining = lock.get("journal", []) if lock else []
+            if swapped:
+                self._apply_journal(db.tag_counts, db.tag_pairs, remaining, seen, journaled)
+            else:
+                self._apply_journal(db.tag_counts, db.tag_pairs, drained + remaining, None, journaled)
+
+        self._snapshot_cache.clear()
+        logger.info(f"Rebuilt tag statistics: {db.tag_counts.estimated_document_count()} tags, "
+                    f"{db.tag_pairs.estimated_document_count()} pairs in {time.time() - start_time:.2f}s")
+        return True
+
+    def _snapshot(self) -> Tuple[Dict[str, int], Dict[str, Dict[str, int]]]:
+        """Tag counts and co-occurrence adjacency, cached for a few seconds"""
+        snapshot = self._snapshot_cache.get("snapshot")
+        if snapshot is not None:
+            return snapshot
+
+        db = self._get_db()
+        counts = {doc["_id"]: doc["count"] for doc in db.tag_counts.find({"count": {"$gt": 0}})}
+        cooccurrence = defaultdict(dict)
+        for doc in db.tag_pairs.find({"count": {"$gt": 0}}):
+            tag_a, tag_b = doc["_id"].split(PAIR_SEPARATOR, 1)
+            cooccurrence[tag_a][tag_b] = doc["count"]
+            cooccurrence[tag_b][tag_a] = doc["count"]
+
+        snapshot = (counts, dict(cooccurrence))
+        self._snapshot_cache.set("snapshot", snapshot)
+        return snapshot
+
+    def get_facets(self, limit: int = 50) -> List[Dict[str, int]]:
+        """Most used tags with their task counts"""
+        counts, _ = self._snapshot()
+        top = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [{"tag": tag, "count": count} for tag, count in top]
+
+    def match_tags(self, terms: Iterable[str]) -> List[str]:
+        """Known tags equal (case-insensitively) to any of the terms"""
+        counts, _ = self._snapshot()
+        wanted = {term.lower() for term in terms}
+        return [tag for tag in counts if tag.lower() in wanted]
+
+    def get_related_tags(self, tags: Iterable[str]) -> Dict[str, float]:
+        """Tags that co-occur with the given ones, scored by P(related | tag)"""
+        counts, cooccurrence = self._snapshot()
+        related = Counter()
+        for tag in tags:
+            total = counts.get(tag)
+            if not total:
+                continue
+            for other, together in cooccurrence.get(tag, {}).items():
+                related[other] += together / total
+        return dict(related)
+
+
+# Singleton instance
+tag_stats_service = TagStatsService()
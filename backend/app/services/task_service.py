@@ -1,10 +1,14 @@
 from typing import Optional, List
 from bson import ObjectId
 from datetime import datetime
+from app.core.request_timing import timed
+from app.core.perf import instrument
 from app.database.connection import get_database
 from app.models.task import TaskCreate, TaskUpdate, TaskInDB, TaskResponse, TaskStatus, TaskSeverity
 from app.services.ai_service import ai_service
 from app.services.embedding_service import embedding_service
+from app.services.tag_stats_service import tag_stats_service
+from app.services.vector_index import vector_index
 
 
 class TaskService:
@@ -18,6 +22,7 @@ class TaskService:
             self.collection = self.db.tasks
         return self.collection
 
+    @instrument
     async def create_task(self, task_data: TaskCreate, user_id: str) -> TaskResponse:
         """Create a new task"""
         collection = self._get_collection()
@@ -47,9 +52,13 @@ class TaskService:
 
         result = collection.insert_one(task_dict)
         task_dict["_id"] = str(result.inserted_id)
+        with timed("index"):
+            vector_index.add_task(task_dict)
+        tag_stats_service.record_tag_change(task_dict["_id"], [], ai_tags)
 
         return TaskResponse(**task_dict)
 
+    @instrument
     async def get_task_by_id(self, task_id: str) -> Optional[TaskResponse]:
         """Get task by ID"""
         try:
@@ -63,11 +72,13 @@ class TaskService:
         except Exception:
             return None
 
+    @instrument
     async def get_tasks(
         self,
         status: Optional[TaskStatus] = None,
         severity: Optional[TaskSeverity] = None,
-        tags: Optional[List[str]] = None
+        tags: Optional[List[str]] = None,
+        assigned_to: Optional[str] = None
     ) -> List[TaskResponse]:
         """Get tasks with optional filtering"""
         collection = self._get_collection()
@@ -79,12 +90,15 @@ class TaskService:
             query["severity"] = severity
         if tags:
             query["tags"] = {"$in": tags}
+        if assigned_to:
+            query["assigned_to"] = assigned_to
 
         tasks = list(collection.find(query).sort("created_at", -1))
         for task in tasks:
             task["_id"] = str(task["_id"])
         return [TaskResponse(**task) for task in tasks]
 
+    @instrument
     async def update_task(self, task_id: str, task_data: TaskUpdate) -> Optional[TaskResponse]:
         """Update a task"""
         try:
@@ -100,31 +114,48 @@ class TaskService:
                 if value is not None:
                     update_data[field] = value
 
-            result = collection.update_one(
+            # Previous tags are needed to adjust the tag statistics
+            previous_task = collection.find_one_and_update(
                 {"_id": ObjectId(task_id)},
-                {"$set": update_data}
+                {"$set": update_data},
+                projection={"tags": 1}
             )
 
-            if result.matched_count == 0:
+            if previous_task is None:
                 return None
 
             updated_task = collection.find_one({"_id": ObjectId(task_id)})
             updated_task["_id"] = str(updated_task["_id"])
+            with timed("index"):
+                vector_index.add_task(updated_task)
+            if "tags" in update_data:
+                tag_stats_service.record_tag_change(task_id, previous_task.get("tags", []), update_data["tags"])
             return TaskResponse(**updated_task)
 
         except Exception:
             return None
 
+    @instrument
     async def delete_task(self, task_id: str) -> bool:
         """Delete a task"""
         try:
             from bson import ObjectId
             collection = self._get_collection()
-            result = collection.delete_one({"_id": ObjectId(task_id)})
-            return result.deleted_count > 0
+            deleted_task = collection.find_one_and_delete(
+                {"_id": ObjectId(task_id)},
+                projection={"tags": 1}
+            )
+            if deleted_task is None:
+                return False
+
+            with timed("index"):
+                vector_index.remove(task_id)
+            tag_stats_service.record_tag_change(task_id, deleted_task.get("tags", []), [])
+            return True
         except Exception:
             return False
 
+    @instrument
     async def get_task_stats(self) -> dict:
         """Get task statistics"""
         collection = self._get_collection()
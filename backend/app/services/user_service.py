@@ -2,9 +2,12 @@ from typing import Optional
 from bson import ObjectId
 from datetime import datetime
 import time
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.perf import instrument
 from app.database.connection import get_database
 from app.models.user import UserCreate, UserInDB, UserResponse
-from app.auth.security import get_password_hash, verify_password
+from app.auth.security import get_password_hash_async, verify_and_update_password_async
 from app.core.logging_config import log_database_operation
 
 
@@ -12,6 +15,8 @@ class UserService:
     def __init__(self):
         self.db = None
         self.collection = None
+        # Profiles by user id; invalidated on every write to that user
+        self._user_cache = TTLCache(maxsize=10000, ttl=settings.user_cache_ttl)
 
     def _get_collection(self):
         if self.collection is None:
@@ -19,6 +24,7 @@ class UserService:
             self.collection = self.db.users
         return self.collection
 
+    @instrument
     async def create_user(self, user_data: UserCreate) -> UserInDB:
         """Create a new user"""
         collection = self._get_collection()
@@ -31,7 +37,7 @@ class UserService:
             raise ValueError("User with this email already exists")
 
         # Hash password and create user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         user_dict = {
             "name": user_data.name,
             "email": user_data.email,
@@ -47,6 +53,7 @@ class UserService:
 
         return UserInDB(**user_dict)
 
+    @instrument
     async def authenticate_user(self, email: str, password: str) -> Optional[UserInDB]:
         """Authenticate user with email and password"""
         collection = self._get_collection()
@@ -59,27 +66,49 @@ class UserService:
             log_database_operation("AUTH_USER", "users", {"email": email}, 0, execution_time)
             return None
 
-        if not verify_password(password, user["password"]):
+        valid, new_hash = await verify_and_update_password_async(password, user["password"])
+        if not valid:
             log_database_operation("AUTH_USER", "users", {"email": email}, 1, execution_time)
             return None
 
+        if new_hash:
+            # Legacy or outdated hash: replace it now that we know the password
+            collection.update_one(
+                {"_id": user["_id"]},
+                {
+                    "$set": {"password": new_hash},
+                    "$unset": {"password_migration_needed": "", "old_password_hash": ""}
+                }
+            )
+            user["password"] = new_hash
+            self._user_cache.invalidate(str(user["_id"]))
+            log_database_operation("REHASH_PASSWORD", "users", {"email": email}, 1)
+
         user["_id"] = str(user["_id"])
         log_database_operation("AUTH_USER", "users", {"email": email}, 1, execution_time)
         return UserInDB(**user)
 
+    @instrument
     async def get_user_by_id(self, user_id: str) -> Optional[UserResponse]:
         """Get user by ID"""
+        cached_user = self._user_cache.get(user_id)
+        if cached_user is not None:
+            return cached_user
+
         try:
             from bson import ObjectId
             collection = self._get_collection()
-            user = collection.find_one({"_id": ObjectId(user_id)})
+            user = collection.find_one({"_id": ObjectId(user_id)}, {"password": 0})
             if user:
                 user["_id"] = str(user["_id"])
-                return UserResponse(**user)
+                user_response = UserResponse(**user)
+                self._user_cache.set(user_id, user_response)
+                return user_response
             return None
         except Exception:
             return None
 
+    @instrument
     async def get_user_by_email(self, email: str) -> Optional[UserInDB]:
         """Get user by email"""
         collection = self._get_collection()
@@ -89,6 +118,7 @@ class UserService:
             return UserInDB(**user)
         return None
 
+    @instrument
     async def get_all_users(self) -> list[UserResponse]:
         """Get all users (for assignment dropdown)"""
         collection = self._get_collection()
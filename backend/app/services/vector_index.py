@@ -0,0 +1,346 @@
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+import logging
+import threading
+from enum import Enum
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Scalar task fields kept as integer-coded columns for filtering
+CODED_FIELDS = ("status", "severity", "assigned_to", "created_by")
+
+# Above this share of selected rows, gathering them costs more than scoring them all
+DENSE_MASK_FRACTION = 0.25
+
+# Only what the index needs; descriptions stay in MongoDB
+INDEX_PROJECTION = {
+    "embedding": 1,
+    "tags": 1,
+    **{field: 1 for field in CODED_FIELDS}
+}
+
+
+def _normalize_value(value: Any) -> Any:
+    """Store enum members by value so filters match what MongoDB holds"""
+    return value.value if isinstance(value, Enum) else value
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, without a full sort"""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.intp)
+    if scores.size > k:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def near_duplicate_pairs(matrix: np.ndarray, threshold: float, block_size: int = 1024) -> np.ndarray:
+    """All (i, j) row pairs with i < j and cosine similarity >= threshold.
+
+    Rows are normalized in place and compared block by block against the
+    rows after them, so each pair is scored once and peak memory is
+    block_size x n similarities.
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    matrix /= norms
+
+    pairs = []
+    n = matrix.shape[0]
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        scores = matrix[start:stop] @ matrix[start:].T
+        # Keep only the strict upper triangle relative to the global row index
+        scores[np.tril_indices(stop - start, m=n - start)] = -1
+        rows, cols = np.nonzero(scores >= threshold)
+        if rows.size:
+            pairs.append(np.column_stack((rows + start, cols + start)))
+
+    if not pairs:
+        return np.empty((0, 2), dtype=np.intp)
+    return np.concatenate(pairs)
+
+
+def cluster_pairs(pairs: np.ndarray, n: int) -> List[List[int]]:
+    """Connected components (size >= 2) of the graph formed by row pairs"""
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs.tolist():
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[root_j] = root_i
+
+    clusters: Dict[int, List[int]] = {}
+    for i in np.unique(pairs).tolist():
+        clusters.setdefault(find(i), []).append(i)
+    return sorted(clusters.values(), key=len, reverse=True)
+
+
+class VectorIndex:
+    """In-memory matrix of task embeddings with filter columns per row.
+
+    Embeddings are stored L2-normalized so cosine similarity is a dot product.
+    Filters are resolved to a boolean row mask before scoring. A narrow mask
+    shrinks the matrix product to the selected rows; a broad one scores the
+    contiguous matrix and masks the scores, which is cheaper than gathering.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self._lock = threading.RLock()
+        self._capacity = initial_capacity
+        self._size = 0
+        self._dim: Optional[int] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._alive = np.zeros(initial_capacity, dtype=bool)
+        self._codes = {field: np.zeros(initial_capacity, dtype=np.int32) for field in CODED_FIELDS}
+        # Code 0 is reserved for "unset"
+        self._vocab: Dict[str, Dict[Any, int]] = {field: {} for field in CODED_FIELDS}
+        self._tag_rows: Dict[str, set] = {}
+        self._row_tags: List[Tuple[str, ...]] = []
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._free_rows: List[int] = []
+        # Tasks added or removed while load() runs; its cursor may hold stale copies
+        self._changed_while_warming: set = set()
+        self.ready = False
+        self.warming = False
+
+    def is_ready(self) -> bool:
+        """Whether searches can be served from memory"""
+        return settings.vector_index_enabled and self.ready
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def load(self, collection, batch_size: int = 1000):
+        """Build the index from every task with an embedding"""
+        if not settings.vector_index_enabled:
+            return
+
+        self.warming = True
+        try:
+            cursor = collection.find(
+                {"embedding": {"$exists": True, "$ne": None}},
+                INDEX_PROJECTION,
+                batch_size=batch_size
+            )
+            for task in cursor:
+                with self._lock:
+                    if str(task["_id"]) in self._changed_while_warming:
+                        continue
+                    self._store(task)
+
+            self.ready = True
+            logger.info(f"Vector index loaded with {len(self)} tasks")
+        except Exception as e:
+            logger.error(f"Failed to load vector index: {e}")
+        finally:
+            self.warming = False
+            self._changed_while_warming.clear()
+
+    def add_task(self, task: Dict[str, Any]):
+        """Insert or replace a task's row from its document"""
+        if not settings.vector_index_enabled:
+            return
+
+        with self._lock:
+            if self.warming:
+                self._changed_while_warming.add(str(task["_id"]))
+            self._store(task)
+
+    def _store(self, task: Dict[str, Any]):
+        embedding = task.get("embedding")
+        task_id = str(task["_id"])
+        if not embedding:
+            self.remove(task_id)
+            return
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return
+
+        with self._lock:
+            if self._dim is None:
+                self._dim = vector.shape[0]
+                self._vectors = np.zeros((self._capacity, self._dim), dtype=np.float32)
+            elif vector.shape[0] != self._dim:
+                logger.warning(f"Skipping task {task_id}: embedding dimension {vector.shape[0]} != {self._dim}")
+                return
+
+            row = self._rows.get(task_id)
+            if row is None:
+                row = self._allocate_row()
+                self._rows[task_id] = row
+                self._ids[row] = task_id
+            else:
+                self._unlink_tags(row)
+
+            self._vectors[row] = vector / norm
+            for field in CODED_FIELDS:
+                self._codes[field][row] = self._encode(field, task.get(field))
+
+            tags = tuple(task.get("tags") or ())
+            self._row_tags[row] = tags
+            for tag in tags:
+                self._tag_rows.setdefault(tag, set()).add(row)
+
+            self._alive[row] = True
+
+    def remove(self, task_id: str):
+        """Drop a task's row; the slot is reused by the next insert"""
+        with self._lock:
+            if self.warming:
+                self._changed_while_warming.add(task_id)
+
+            row = self._rows.pop(task_id, None)
+            if row is None:
+                return
+
+            self._alive[row] = False
+            self._unlink_tags(row)
+            self._ids[row] = None
+            self._free_rows.append(row)
+
+    def get_vector(self, task_id: str) -> Optional[np.ndarray]:
+        """Normalized embedding of an indexed task"""
+        with self._lock:
+            row = self._rows.get(task_id)
+            return None if row is None else self._vectors[row].copy()
+
+    def search(
+        self,
+        query_embedding: Iterable[float],
+        limit: int = 20,
+        similarity_threshold: float = 0.0,
+        **filters
+    ) -> List[Tuple[str, float]]:
+        """Return (task_id, cosine similarity) pairs for the best matching rows"""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query = query / norm
+
+        with self._lock:
+            if self._vectors is None or query.shape[0] != self._dim:
+                return []
+
+            mask = self._mask(**filters)
+            selected = np.count_nonzero(mask)
+            if selected == 0:
+                return []
+
+            if selected >= DENSE_MASK_FRACTION * self._size:
+                scores = self._vectors[:self._size] @ query
+                rows = np.flatnonzero(mask & (scores >= similarity_threshold))
+                scores = scores[rows]
+            else:
+                rows = np.flatnonzero(mask)
+                scores = self._vectors[rows] @ query
+                passing = scores >= similarity_threshold
+                rows, scores = rows[passing], scores[passing]
+
+            top = top_k_indices(scores, limit)
+            return [(self._ids[rows[i]], float(scores[i])) for i in top]
+
+    def _mask(
+        self,
+        status: Any = None,
+        severity: Any = None,
+        assigned_to: Any = None,
+        created_by: Any = None,
+        tags: Optional[List[str]] = None,
+        exclude_ids: Optional[Iterable[str]] = None
+    ) -> np.ndarray:
+        """Boolean mask of live rows matching every given filter"""
+        mask = self._alive[:self._size].copy()
+
+        for field, value in (("status", status), ("severity", severity),
+                             ("assigned_to", assigned_to), ("created_by", created_by)):
+            if value is None:
+                continue
+            code = self._vocab[field].get(_normalize_value(value))
+            if code is None:
+                mask[:] = False
+                return mask
+            mask &= self._codes[field][:self._size] == code
+
+        if tags:
+            # Any-of semantics, matching get_tasks' {"$in": tags}
+            tag_mask = np.zeros(self._size, dtype=bool)
+            for tag in tags:
+                rows = self._tag_rows.get(tag)
+                if rows:
+                    tag_mask[np.fromiter(rows, dtype=np.intp, count=len(rows))] = True
+            mask &= tag_mask
+
+        if exclude_ids:
+            for task_id in exclude_ids:
+                row = self._rows.get(task_id)
+                if row is not None:
+                    mask[row] = False
+
+        return mask
+
+    def _encode(self, field: str, value: Any) -> int:
+        if value is None:
+            return 0
+        vocab = self._vocab[field]
+        value = _normalize_value(value)
+        code = vocab.get(value)
+        if code is None:
+            code = len(vocab) + 1
+            vocab[value] = code
+        return code
+
+    def _unlink_tags(self, row: int):
+        for tag in self._row_tags[row]:
+            rows = self._tag_rows.get(tag)
+            if rows is not None:
+                rows.discard(row)
+                if not rows:
+                    del self._tag_rows[tag]
+        self._row_tags[row] = ()
+
+    def _allocate_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+
+        if self._size == self._capacity:
+            self._grow(self._capacity * 2)
+
+        row = self._size
+        self._size += 1
+        self._ids.append(None)
+        self._row_tags.append(())
+        return row
+
+    def _grow(self, capacity: int):
+        vectors = np.zeros((capacity, self._dim), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        self._vectors = vectors
+
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._alive = alive
+
+        for field in CODED_FIELDS:
+            codes = np.zeros(capacity, dtype=np.int32)
+            codes[:self._size] = self._codes[field][:self._size]
+            self._codes[field] = codes
+
+        self._capacity = capacity
+
+
+# Singleton instance
+vector_index = VectorIndex()
@@ -1,13 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 from app.core.config import settings
-from app.core.logging_config import setup_logging
-from app.database.connection import connect_to_mongo, close_mongo_connection
+from app.core.logging_config import setup_logging, shutdown_logging
+from app.core.metrics import metrics_registry
+from app.database.connection import connect_to_mongo, close_mongo_connection, get_database
 from app.middleware.logging_middleware import LoggingMiddleware
-from app.routers import auth, tasks, users, logs
+from app.middleware.profiling_middleware import ProfilingMiddleware
+from app.routers import auth, tasks, users, logs, metrics, debug
+from app.services.tag_stats_service import tag_stats_service
+from app.services.vector_index import vector_index
 
 # Setup logging system
 setup_logging()
@@ -19,10 +24,20 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up...")
     connect_to_mongo()
+    # Publish this worker's metrics for /metrics served by any worker
+    metrics_registry.start_exporter()
+    if settings.vector_index_enabled:
+        # Warm the search index in the background; searches use MongoDB until it is ready
+        asyncio.get_running_loop().run_in_executor(None, vector_index.load, get_database().tasks)
+    # Backfill tag statistics the first time they are needed; one worker builds, failures are logged
+    asyncio.get_running_loop().run_in_executor(None, tag_stats_service.ensure_built)
     yield
     # Shutdown
     logger.info("Shutting down...")
     close_mongo_connection()
+    metrics_registry.stop_exporter()
+    # Write out everything still queued for the log files
+    shutdown_logging()
 
 
 # Create FastAPI app
@@ -34,6 +49,10 @@ app = FastAPI(
 )
 
 # Add middleware
+if settings.profiling_enabled:
+    # Innermost, so profiles cover the handler and not the logging around it
+    app.add_middleware(ProfilingMiddleware)
+
 app.add_middleware(LoggingMiddleware)
 
 app.add_middleware(
@@ -49,6 +68,9 @@ app.include_router(auth.router, prefix="/api")
 app.include_router(tasks.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
 app.include_router(logs.router, prefix="/api")
+app.include_router(debug.router, prefix="/api")
+if settings.metrics_enabled:
+    app.include_router(metrics.router)
 
 
 @app.get("/")
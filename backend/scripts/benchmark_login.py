@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark for Task Management API
+Compares bcrypt verification inline on the event loop with the dedicated
+password pool, under concurrent logins
+Usage: python scripts/benchmark_login.py [--logins 200] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.auth.security import get_password_hash, verify_password, verify_and_update_password_async
+from app.core.config import settings
+
+PASSWORD = "benchmark-password"
+
+
+async def heartbeat(interval: float, stalls: list, stop: asyncio.Event):
+    """Record how late the event loop wakes a periodic timer"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        stalls.append(max(0.0, loop.time() - expected))
+
+
+async def run(mode: str, logins: int, concurrency: int, password_hash: str):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    stalls = []
+    stop = asyncio.Event()
+
+    async def login():
+        async with semaphore:
+            start = time.perf_counter()
+            if mode == "inline":
+                verify_password(PASSWORD, password_hash)
+            else:
+                await verify_and_update_password_async(PASSWORD, password_hash)
+            latencies.append(time.perf_counter() - start)
+
+    ticker = asyncio.create_task(heartbeat(0.01, stalls, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    latencies.sort()
+    print(f"{mode:>7}: {logins / elapsed:7.1f} logins/s | "
+          f"p50 {statistics.median(latencies) * 1000:7.1f}ms | "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:7.1f}ms | "
+          f"max loop stall {max(stalls, default=0) * 1000:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark login password verification')
+    parser.add_argument('--logins', type=int, default=200, help='Total logins to simulate')
+    parser.add_argument('--concurrency', type=int, default=50, help='Logins in flight at once')
+    args = parser.parse_args()
+
+    password_hash = get_password_hash(PASSWORD)
+    print(f"{args.logins} logins, concurrency {args.concurrency}, "
+          f"password pool size {settings.password_hash_workers}")
+
+    for mode in ("inline", "pooled"):
+        asyncio.run(run(mode, args.logins, args.concurrency, password_hash))
+
+
+if __name__ == "__main__":
+    main()
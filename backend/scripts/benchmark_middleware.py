@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Request logging middleware overhead benchmark for Task Management API
+Drives a minimal ASGI app directly (no server, no sockets) bare, behind the
+previous BaseHTTPMiddleware implementation and behind the ASGI
+LoggingMiddleware, and reports the added cost per request
+Usage: python scripts/benchmark_middleware.py [--requests 20000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import logging
+import queue
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.core.logging_config import BoundedQueueHandler, LogQueueListener, LogQueueStats, log_api_request
+from app.middleware.logging_middleware import LoggingMiddleware
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware implementation LoggingMiddleware replaced"""
+
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        user_id = "authenticated" if request.headers.get("authorization", "").startswith("Bearer ") else None
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        log_api_request(request.method, str(request.url), response.status_code, process_time, user_id)
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+async def plain(request):
+    return PlainTextResponse("ok")
+
+
+async def stream(request):
+    async def chunks():
+        for _ in range(4):
+            yield b"chunk"
+    return StreamingResponse(chunks())
+
+
+def build_app(middleware):
+    app = Starlette(routes=[Route("/api/plain", plain), Route("/api/stream", stream)])
+    return middleware(app) if middleware else app
+
+
+def make_scope(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"limit=20",
+        "headers": [(b"host", b"localhost:8000"), (b"authorization", b"Bearer benchmark.token.value")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 8000),
+    }
+
+
+def make_receive():
+    """Like a server: the request body once, then wait until the client goes away"""
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    return receive
+
+
+async def run(app, path: str, requests: int) -> float:
+    """Mean microseconds per request"""
+    scope = make_scope(path)
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter_ns()
+    for _ in range(requests):
+        await app(dict(scope), make_receive(), send)
+    return (time.perf_counter_ns() - start) / requests / 1000
+
+
+def setup_access_logging() -> LogQueueListener:
+    """Send access records through the real queue handler to a listener that discards them"""
+    log_queue = queue.Queue(maxsize=100000)
+    access_logger = logging.getLogger("access")
+    access_logger.setLevel(logging.INFO)
+    access_logger.propagate = False
+    access_logger.handlers = [BoundedQueueHandler(log_queue, "access", LogQueueStats())]
+
+    listener = LogQueueListener(log_queue, logging.NullHandler())
+    listener.start()
+    return listener
+
+
+async def main_async(requests: int, repeat: int):
+    variants = [
+        ("bare", build_app(None)),
+        ("legacy", build_app(LegacyLoggingMiddleware)),
+        ("asgi", build_app(LoggingMiddleware)),
+    ]
+
+    for path in ("/api/plain", "/api/stream"):
+        print(f"{path} ({requests} requests x {repeat} runs, best run)")
+        results = {}
+        for name, app in variants:
+            await run(app, path, min(requests, 1000))  # warm up
+            results[name] = min([await run(app, path, requests) for _ in range(repeat)])
+
+        for name in ("bare", "legacy", "asgi"):
+            overhead = results[name] - results["bare"]
+            line = f"  {name:>7}: {results[name]:8.1f} us/request"
+            if name != "bare":
+                line += f" | overhead {overhead:7.1f} us"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark request logging middleware overhead')
+    parser.add_argument('--requests', type=int, default=20000, help='Requests per run (default: 20000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per variant; the best is reported (default: 5)')
+    args = parser.parse_args()
+
+    listener = setup_access_logging()
+    try:
+        asyncio.run(main_async(args.requests, args.repeat))
+    finally:
+        listener.stop()
+
+
+if __name__ == "__main__":
+    main()
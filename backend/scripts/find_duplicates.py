@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate task finder for Task Management API
+Groups tasks whose embeddings are above a similarity threshold into clusters
+Usage: python scripts/find_duplicates.py [--threshold 0.9] [--created-by USER_ID]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from bson import ObjectId
+from app.database.connection import connect_to_mongo, get_database
+from app.core.config import settings
+from app.services.search_service import search_service
+import logging
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def find_duplicates(threshold: float, created_by: str = None, block_size: int = 1024):
+    """Print every cluster of near-duplicate tasks"""
+    connect_to_mongo()
+    db = get_database()
+
+    start_time = time.time()
+    clusters = search_service.find_duplicate_clusters(threshold, created_by, block_size)
+    elapsed = time.time() - start_time
+
+    logger.info(f"Found {len(clusters)} duplicate clusters in {elapsed:.2f}s (threshold {threshold})")
+
+    for number, cluster in enumerate(clusters, start=1):
+        titles = {
+            str(task["_id"]): task.get("title", "")
+            for task in db.tasks.find({"_id": {"$in": [ObjectId(i) for i in cluster]}}, {"title": 1})
+        }
+        print(f"\nCluster {number} ({len(cluster)} tasks)")
+        for task_id in cluster:
+            print(f"  {task_id}  {titles.get(task_id, '')}")
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Find clusters of near-duplicate tasks')
+    parser.add_argument('--threshold', type=float, default=settings.duplicate_similarity_threshold,
+                       help='Cosine similarity above which two tasks are duplicates')
+    parser.add_argument('--created-by', help='Only compare tasks created by this user ID')
+    parser.add_argument('--block-size', type=int, default=1024,
+                       help='Rows per matrix block (trades memory for speed)')
+
+    args = parser.parse_args()
+    find_duplicates(args.threshold, args.created_by, args.block_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,88 +2,179 @@
 """
 Password migration script for Task Management API
 This script migrates old Werkzeug password hashes to bcrypt
+
+Note: legacy and outdated hashes are now replaced transparently on the next
+successful login (see UserService.authenticate_user), so migration is only
+needed for accounts that never log in again.
 """
 
 import sys
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Add the backend directory to the Python path
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
 
+from pymongo import UpdateOne
 from app.database.connection import connect_to_mongo, get_database
-from app.auth.security import get_password_hash
-from werkzeug.security import check_password_hash
+from app.auth.security import get_password_hash, pwd_context
 import logging
 
 # Setup logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(processName)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+CHECKPOINT_ID = "password_migration"
+
 
 def is_werkzeug_hash(password_hash: str) -> bool:
-    """Check if a password hash is in Werkzeug format"""
-    # Werkzeug hashes typically start with method$salt$hash or pbkdf2:sha256:...
-    return (
-        password_hash.startswith('pbkdf2:') or 
-        password_hash.startswith('scrypt:') or
-        '$' in password_hash
-    )
+    """Check if a password hash is in Werkzeug (or another non-current) format"""
+    # Anything passlib cannot identify is a legacy hash (pbkdf2:sha256:..., scrypt:...);
+    # identifiable hashes need migration only if they use a deprecated scheme
+    try:
+        return pwd_context.needs_update(password_hash)
+    except (ValueError, TypeError):
+        return True
+
+
+def plan_ranges(users_collection, workers: int) -> list:
+    """Split the users collection into contiguous _id ranges of similar size"""
+    if workers <= 1:
+        return [{"start": None, "end": None, "last_id": None, "done": False}]
+
+    buckets = list(users_collection.aggregate([
+        {"$project": {"_id": 1}},
+        {"$bucketAuto": {"groupBy": "$_id", "buckets": workers}}
+    ]))
+    ranges = []
+    for index, bucket in enumerate(buckets):
+        ranges.append({
+            "start": bucket["_id"]["min"],
+            # bucketAuto upper bounds are exclusive except for the last bucket
+            "end": None if index == len(buckets) - 1 else bucket["_id"]["max"],
+            "last_id": None,
+            "done": False
+        })
+    return ranges or [{"start": None, "end": None, "last_id": None, "done": False}]
+
+
+def migrate_range(range_index: int, batch_size: int) -> dict:
+    """Flag legacy hashes in one _id range, resuming from its checkpoint"""
+    connect_to_mongo()
+    db = get_database()
+    users_collection = db.users
+    checkpoints = db.migration_checkpoints
+
+    plan = checkpoints.find_one({"_id": CHECKPOINT_ID})
+    id_range = plan["ranges"][range_index]
+
+    id_query = {}
+    if id_range["last_id"] is not None:
+        id_query["$gt"] = id_range["last_id"]
+    elif id_range["start"] is not None:
+        id_query["$gte"] = id_range["start"]
+    if id_range["end"] is not None:
+        id_query["$lt"] = id_range["end"]
+
+    cursor = users_collection.find(
+        {"_id": id_query} if id_query else {},
+        {"password": 1}
+    ).sort("_id", 1).batch_size(batch_size)
+
+    scanned = 0
+    flagged = 0
+    start_time = time.time()
+    batch = []
+
+    def flush(last_id):
+        nonlocal flagged
+        if batch:
+            result = users_collection.bulk_write(batch, ordered=False)
+            flagged += result.modified_count
+            batch.clear()
+        checkpoints.update_one(
+            {"_id": CHECKPOINT_ID},
+            {"$set": {f"ranges.{range_index}.last_id": last_id}}
+        )
+        elapsed = time.time() - start_time
+        logger.info(f"Range {range_index}: scanned {scanned}, flagged {flagged} "
+                    f"({scanned / elapsed if elapsed else 0:.0f} users/s)")
+
+    last_id = None
+    for user in cursor:
+        scanned += 1
+        last_id = user["_id"]
+        current_hash = user.get("password") or ""
+
+        if is_werkzeug_hash(current_hash):
+            # Users keep logging in with the old hash, which is replaced on
+            # their next successful login; the flag drives password resets
+            batch.append(UpdateOne(
+                {"_id": user["_id"]},
+                {"$set": {"password_migration_needed": True, "old_password_hash": current_hash}}
+            ))
+
+        if scanned % batch_size == 0:
+            flush(last_id)
 
+    if last_id is not None:
+        flush(last_id)
+    checkpoints.update_one({"_id": CHECKPOINT_ID}, {"$set": {f"ranges.{range_index}.done": True}})
 
-def migrate_user_passwords():
-    """Migrate all user passwords from Werkzeug to bcrypt format"""
+    return {"scanned": scanned, "flagged": flagged, "elapsed": time.time() - start_time}
+
+
+def migrate_user_passwords(batch_size: int = 1000, workers: int = 1, restart: bool = False):
+    """Flag all users with Werkzeug/legacy password hashes for password reset.
+
+    Users are streamed in _id order with only the password projected, flags
+    are written with unordered bulk writes, and progress is checkpointed in
+    the migration_checkpoints collection after every batch so an interrupted
+    run resumes where it stopped. With workers > 1 the collection is split
+    into _id ranges processed in parallel.
+    """
     try:
         # Connect to database
         connect_to_mongo()
         db = get_database()
-        users_collection = db.users
-        
-        # Find all users
-        users = list(users_collection.find({}))
-        logger.info(f"Found {len(users)} users to check")
-        
-        migrated_count = 0
-        skipped_count = 0
-        
-        for user in users:
-            user_id = user['_id']
-            email = user['email']
-            current_hash = user['password']
-            
-            # Check if this is a Werkzeug hash that needs migration
-            if is_werkzeug_hash(current_hash):
-                logger.info(f"Migrating password for user: {email}")
-                
-                # For migration, we'll need to prompt for the password or use a default
-                # In a real scenario, you'd either:
-                # 1. Force users to reset their passwords
-                # 2. Have them re-enter their password during migration
-                # 3. Use a temporary password
-                
-                # For this demo, we'll mark these users as needing password reset
-                users_collection.update_one(
-                    {'_id': user_id},
-                    {
-                        '$set': {
-                            'password_migration_needed': True,
-                            'old_password_hash': current_hash
-                        }
-                    }
-                )
-                migrated_count += 1
-                logger.info(f"Marked user {email} for password reset")
-                
-            else:
-                logger.debug(f"User {email} already has bcrypt hash, skipping")
-                skipped_count += 1
-        
-        logger.info(f"Migration complete: {migrated_count} users marked for password reset, {skipped_count} users skipped")
+        checkpoints = db.migration_checkpoints
+
+        plan = None if restart else checkpoints.find_one({"_id": CHECKPOINT_ID})
+        if plan is None or all(r["done"] for r in plan["ranges"]):
+            ranges = plan_ranges(db.users, workers)
+            checkpoints.replace_one(
+                {"_id": CHECKPOINT_ID},
+                {"_id": CHECKPOINT_ID, "ranges": ranges, "batch_size": batch_size},
+                upsert=True
+            )
+            logger.info(f"Starting password migration over {len(ranges)} range(s)")
+        else:
+            ranges = plan["ranges"]
+            logger.info(f"Resuming password migration from checkpoint ({len(ranges)} range(s))")
+
+        pending = [index for index, id_range in enumerate(ranges) if not id_range["done"]]
+        start_time = time.time()
+
+        if len(pending) == 1:
+            results = [migrate_range(pending[0], batch_size)]
+        else:
+            with ProcessPoolExecutor(max_workers=len(pending)) as executor:
+                results = list(executor.map(migrate_range, pending, [batch_size] * len(pending)))
+
+        scanned = sum(result["scanned"] for result in results)
+        migrated_count = sum(result["flagged"] for result in results)
+        elapsed = time.time() - start_time
+
+        logger.info(f"Migration complete: {migrated_count} users marked for password reset, "
+                    f"{scanned} users scanned in {elapsed:.1f}s "
+                    f"({scanned / elapsed if elapsed else 0:.0f} users/s)")
         
         if migrated_count > 0:
             logger.info("Users with old password hashes have been marked for password reset.")
-            logger.info("They will need to reset their passwords on next login.")
+            logger.info("Their hashes are also upgraded automatically on their next successful login.")
         
     except Exception as e:
         logger.error(f"Error during migration: {e}")
@@ -173,11 +264,14 @@ def main():
                        help='Action to perform')
     parser.add_argument('--email', help='Email for reset action')
     parser.add_argument('--password', help='New password for reset action')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Users per bulk write and checkpoint')
+    parser.add_argument('--workers', type=int, default=1, help='Parallel processes, each over its own _id range')
+    parser.add_argument('--restart', action='store_true', help='Ignore any saved checkpoint and start over')
     
     args = parser.parse_args()
     
     if args.action == 'migrate':
-        migrate_user_passwords()
+        migrate_user_passwords(args.batch_size, args.workers, args.restart)
     elif args.action == 'reset':
         if not args.email or not args.password:
             logger.error("Email and password are required for reset action")
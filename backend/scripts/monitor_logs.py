@@ -1,51 +1,136 @@
 #!/usr/bin/env python3
 """
 Log monitoring script for Task Management API
-Usage: python scripts/monitor_logs.py [log_type] [--tail] [--search term]
+Usage: python scripts/monitor_logs.py [log_type ...] [--tail] [--search term]
 """
 
 import argparse
-import time
+import asyncio
 import os
 from pathlib import Path
 from datetime import datetime
 import sys
 
-def tail_file(file_path, lines=10):
-    """Tail a file and return last N lines"""
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.log_index import update_index
+from app.core.log_reader import read_log_page
+
+try:
+    # Installed with uvicorn[standard]; without it, follow mode polls
+    from watchfiles import awatch
+except ImportError:
+    awatch = None
+
+LOG_TYPES = ['app', 'error', 'access', 'database', 'auth']
+POLL_MIN_INTERVAL = 0.1  # seconds between polls right after new lines
+POLL_MAX_INTERVAL = 2.0  # polling backs off to this while the logs are idle
+
+def tail_file(file_path, lines=10, search_term=None):
+    """Last N (matching) lines, read backwards from the end of the file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            all_lines = f.readlines()
-            return all_lines[-lines:] if len(all_lines) > lines else all_lines
+        page = read_log_page(Path(file_path), lines, search_term)
+        return [line + "\n" for line in page["lines"]]
     except FileNotFoundError:
         return [f"Log file not found: {file_path}\n"]
     except Exception as e:
         return [f"Error reading file: {e}\n"]
 
-def follow_file(file_path, search_term=None):
-    """Follow a file like 'tail -f'"""
+class LogFollower:
+    """Follows one log type across daily files, starting at the current end"""
+
+    def __init__(self, log_dir, log_type, search_term=None, prefix=""):
+        self.log_dir = log_dir
+        self.log_type = log_type
+        self.search_term = search_term.lower() if search_term else None
+        self.prefix = prefix
+        self.date = None
+        self.file = None
+        self.partial = b""
+        self.open_current(from_end=True)
+
+    def open_current(self, from_end=False):
+        """Switch to today's file; a new day's file is read from its start"""
+        self.date = datetime.now().strftime('%Y-%m-%d')
+        path = self.log_dir / f"{self.log_type}-{self.date}.log"
+        if self.file:
+            self.file.close()
+            self.file = None
+        self.partial = b""
+        if path.exists():
+            self.file = open(path, 'rb')
+            if from_end:
+                self.file.seek(0, 2)
+
+    def poll(self):
+        """Print lines written since the last poll; True if there were any"""
+        got_lines = self.read_new()
+        if datetime.now().strftime('%Y-%m-%d') != self.date:
+            # Midnight: finish the old file, then move to the new one
+            self.open_current()
+            got_lines = self.read_new() or got_lines
+        elif self.file is None:
+            # File not created yet when following started
+            self.open_current()
+            got_lines = self.read_new() or got_lines
+        return got_lines
+
+    def read_new(self):
+        if self.file is None:
+            return False
+        if os.fstat(self.file.fileno()).st_size < self.file.tell():
+            # Truncated or recreated in place
+            self.file.seek(0)
+            self.partial = b""
+        data = self.file.read()
+        if not data:
+            return False
+        *lines, self.partial = (self.partial + data).split(b"\n")
+        for line in lines:
+            text = line.decode('utf-8', errors='replace').rstrip('\r')
+            if self.search_term is None or self.search_term in text.lower():
+                print(f"{self.prefix}{text}")
+        return bool(lines)
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+async def follow_logs(log_types, search_term=None):
+    """Follow several log types at once (like 'tail -f'), rolling over at midnight.
+
+    One event loop serves every file: it waits for change notifications on
+    the log directory when watchfiles is installed, and otherwise polls,
+    backing off while nothing is written.
+    """
+    log_dir = Path("logs")
+    prefix_width = max(len(log_type) for log_type in log_types)
+    followers = [
+        LogFollower(log_dir, log_type, search_term, f"[{log_type:<{prefix_width}}] " if len(log_types) > 1 else "")
+        for log_type in log_types
+    ]
+
+    print(f"Following {', '.join(log_types)} logs (Press Ctrl+C to stop)")
+    print("-" * 50)
+
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            # Go to end of file
-            f.seek(0, 2)
-            
-            print(f"Following {file_path} (Press Ctrl+C to stop)")
-            print("-" * 50)
-            
+        if awatch is not None:
+            async for _ in awatch(log_dir, debounce=50, step=20):
+                for follower in followers:
+                    follower.poll()
+        else:
+            interval = POLL_MIN_INTERVAL
             while True:
-                line = f.readline()
-                if line:
-                    if search_term is None or search_term.lower() in line.lower():
-                        print(line.rstrip())
-                else:
-                    time.sleep(0.1)
-                    
-    except KeyboardInterrupt:
-        print("\nStopped following log file.")
-    except FileNotFoundError:
-        print(f"Log file not found: {file_path}")
-    except Exception as e:
-        print(f"Error following file: {e}")
+                got_lines = False
+                for follower in followers:
+                    got_lines = follower.poll() or got_lines
+                interval = POLL_MIN_INTERVAL if got_lines else min(interval * 2, POLL_MAX_INTERVAL)
+                await asyncio.sleep(interval)
+    finally:
+        for follower in followers:
+            follower.close()
 
 def show_log_stats():
     """Show statistics for all log files"""
@@ -65,18 +150,25 @@ def show_log_stats():
         
         if log_file.exists():
             stat = log_file.stat()
-            with open(log_file, 'r', encoding='utf-8') as f:
-                lines = len(f.readlines())
+            # Shares the API's sidecar index, so only new bytes are read
+            index = update_index(log_file)
             
-            print(f"{log_type.upper():>10}: {lines:>6} lines, {stat.st_size:>8} bytes")
+            print(f"{log_type.upper():>10}: {index['lines']:>6} lines, {stat.st_size:>8} bytes")
+            if log_type in ['app', 'error']:
+                levels = ", ".join(f"{level}={count}" for level, count in index['levels'].items() if count)
+                if levels:
+                    print(f"{'':>12}{levels}")
+            elif log_type == 'access' and index['status_classes']:
+                classes = ", ".join(f"{name}={round(count)}" for name, count in sorted(index['status_classes'].items()))
+                print(f"{'':>12}{classes}")
         else:
             print(f"{log_type.upper():>10}: No log file found")
 
 def main():
     parser = argparse.ArgumentParser(description='Monitor Task Management API logs')
-    parser.add_argument('log_type', nargs='?', choices=['app', 'error', 'access', 'database', 'auth', 'stats'], 
-                       help='Type of log to monitor')
-    parser.add_argument('--tail', '-t', action='store_true', help='Follow the log file (like tail -f)')
+    parser.add_argument('log_types', nargs='*', metavar='log_type',
+                       help=f"Log types to show or follow ({', '.join(LOG_TYPES)}), or 'stats'")
+    parser.add_argument('--tail', '-t', action='store_true', help='Follow the log files (like tail -f)')
     parser.add_argument('--lines', '-n', type=int, default=20, help='Number of lines to show (default: 20)')
     parser.add_argument('--search', '-s', type=str, help='Search for specific term')
     parser.add_argument('--date', '-d', type=str, help='Date in YYYY-MM-DD format (default: today)')
@@ -87,36 +179,44 @@ def main():
     if os.path.exists('backend'):
         os.chdir('backend')
     
-    if args.log_type == 'stats' or args.log_type is None:
+    if not args.log_types or args.log_types == ['stats']:
         show_log_stats()
         return
+
+    invalid = [log_type for log_type in args.log_types if log_type not in LOG_TYPES]
+    if invalid:
+        parser.error(f"invalid log type: {', '.join(invalid)} (choose from {', '.join(LOG_TYPES)} or stats)")
     
     # Use today's date if not specified
     date = args.date or datetime.now().strftime('%Y-%m-%d')
-    
-    log_file = Path(f"logs/{args.log_type}-{date}.log")
-    
-    if not log_file.exists():
-        print(f"Log file not found: {log_file}")
-        print("Available log files:")
-        log_dir = Path("logs")
-        if log_dir.exists():
-            for file in sorted(log_dir.glob("*.log")):
-                print(f"  {file.name}")
-        return
-    
-    if args.tail:
-        follow_file(log_file, args.search)
-    else:
-        lines = tail_file(log_file, args.lines)
+
+    for log_type in args.log_types:
+        log_file = Path(f"logs/{log_type}-{date}.log")
+        if not log_file.exists() and Path(f"{log_file}.gz").exists():
+            log_file = Path(f"{log_file}.gz")
         
-        if args.search:
-            lines = [line for line in lines if args.search.lower() in line.lower()]
+        if not log_file.exists():
+            print(f"Log file not found: {log_file}")
+            print("Available log files:")
+            log_dir = Path("logs")
+            if log_dir.exists():
+                for file in sorted(log_dir.glob("*.log*")):
+                    print(f"  {file.name}")
+            continue
+        
+        lines = tail_file(log_file, args.lines, args.search)
         
         print(f"Last {len(lines)} lines from {log_file.name}:")
         print("-" * 50)
         for line in lines:
             print(line.rstrip())
+        print()
+    
+    if args.tail:
+        try:
+            asyncio.run(follow_logs(args.log_types, args.search))
+        except KeyboardInterrupt:
+            print("\nStopped following log files.")
 
 if __name__ == "__main__":
     main()
@@ -44,6 +44,7 @@ import { DatePicker } from '@mui/x-date-pickers/DatePicker';
 import { LocalizationProvider } from '@mui/x-date-pickers/LocalizationProvider';
 import { AdapterDateFns } from '@mui/x-date-pickers/AdapterDateFns';
 import { SaveFilterDialog, ConfirmDialog, useConfirmDialog } from './common';
+import { tasksAPI } from '../utils/api';
 
 const FilterSection = ({
   tasks = [],
@@ -87,6 +88,9 @@ const FilterSection = ({
     assignees: [],
   });
 
+  // Corpus-wide tag usage counts, most used first
+  const [tagFacets, setTagFacets] = useState([]);
+
   // Quick filter presets
   const quickFilters = [
     { id: 'my-tasks', label: 'My Tasks', icon: <Person /> },
@@ -96,6 +100,19 @@ const FilterSection = ({
     { id: 'unassigned', label: 'Unassigned', icon: <Person /> },
   ];
 
+  // Load tag facets once
+  useEffect(() => {
+    const loadTagFacets = async () => {
+      try {
+        const response = await tasksAPI.getTagFacets();
+        setTagFacets(response.data.tags);
+      } catch (error) {
+        console.error('Error loading tag facets:', error);
+      }
+    };
+    loadTagFacets();
+  }, []);
+
   // Extract available options from tasks
   useEffect(() => {
     const tags = new Set();
@@ -110,11 +127,15 @@ const FilterSection = ({
       }
     });
 
+    // Most used tags across all tasks first, then any others on the loaded tasks
+    const facetTags = tagFacets.map(facet => facet.tag);
+    const otherTags = Array.from(tags).filter(tag => !facetTags.includes(tag)).sort();
+
     setAvailableOptions({
-      tags: Array.from(tags).sort(),
+      tags: [...facetTags, ...otherTags],
       assignees: Array.from(assignees).filter(Boolean).sort(),
     });
-  }, [tasks]);
+  }, [tasks, tagFacets]);
 
   // Notify parent when filters change
   useEffect(() => {
@@ -270,7 +291,7 @@ const FilterSection = ({
     }
   };
 
-  const renderMultiSelect = (label, value, options, onChange, icon, getColor = null) => (
+  const renderMultiSelect = (label, value, options, onChange, icon, getColor = null, getCount = null) => (
     <FormControl fullWidth size="small">
       <InputLabel>{label}</InputLabel>
       <Select
@@ -296,7 +317,7 @@ const FilterSection = ({
         {options.map((option) => (
           <MenuItem key={option} value={option}>
             <Checkbox checked={value.indexOf(option) > -1} />
-            <ListItemText primary={option} />
+            <ListItemText primary={option} secondary={getCount ? getCount(option) : null} />
           </MenuItem>
         ))}
       </Select>
@@ -469,7 +490,12 @@ const FilterSection = ({
                   filters.tags,
                   availableOptions.tags,
                   (value) => handleMultiSelectChange('tags', value),
-                  <LocalOffer />
+                  <LocalOffer />,
+                  null,
+                  (tag) => {
+                    const facet = tagFacets.find(item => item.tag === tag);
+                    return facet ? `${facet.count} tasks` : null;
+                  }
                 )}
               </Grid>
 
@@ -23,7 +23,7 @@ import {
   FilterList,
 } from '@mui/icons-material';
 import { useTheme } from '@mui/material/styles';
-import { tasksAPI } from '../utils/api';
+import { tasksAPI, streamSearchTasks } from '../utils/api';
 import { toast } from 'react-toastify';
 
 const SearchBar = ({ 
@@ -42,6 +42,7 @@ const SearchBar = ({
   const [searchHistory, setSearchHistory] = useState([]);
   const searchInputRef = useRef(null);
   const searchTimeoutRef = useRef(null);
+  const streamAbortRef = useRef(null);
 
   useEffect(() => {
     // Load search history from localStorage
@@ -73,9 +74,66 @@ const SearchBar = ({
     };
   }, [query, searchType]);
 
+  const performStreamingSearch = async (searchQuery) => {
+    // A newer query supersedes any stream still in flight
+    if (streamAbortRef.current) {
+      streamAbortRef.current.abort();
+    }
+    const controller = new AbortController();
+    streamAbortRef.current = controller;
+
+    setLoading(true);
+    try {
+      await streamSearchTasks(
+        { query: searchQuery, limit: 50 },
+        (stage, data) => {
+          if (stage === 'error') {
+            throw new Error(data.detail);
+          }
+
+          // Show the fastest stage immediately, then refine in place
+          onSearchResults(data.results || []);
+          setLoading(false);
+
+          if (stage === 'intelligent') {
+            setSuggestions(data.suggestions || []);
+            setEnhancedQuery(data.enhanced_query || searchQuery);
+          }
+
+          if (onSearchChange) {
+            onSearchChange({
+              query: searchQuery,
+              enhancedQuery: data.enhanced_query,
+              totalResults: data.total_results,
+              searchType: searchType,
+              stage,
+            });
+          }
+        },
+        controller.signal
+      );
+
+      saveToSearchHistory(searchQuery);
+    } catch (error) {
+      if (error.name === 'AbortError') return;
+      console.error('Search error:', error);
+      toast.error('Search failed. Please try again.');
+      onSearchResults([]);
+    } finally {
+      if (streamAbortRef.current === controller) {
+        streamAbortRef.current = null;
+        setLoading(false);
+      }
+    }
+  };
+
   const performSearch = async (searchQuery) => {
     if (!searchQuery.trim()) return;
 
+    if (searchType === 'intelligent') {
+      return performStreamingSearch(searchQuery);
+    }
+
     setLoading(true);
     try {
       const response = await tasksAPI.searchTasks({
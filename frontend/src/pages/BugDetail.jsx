@@ -15,6 +15,9 @@ import {
   MenuItem,
   Alert,
   CircularProgress,
+  List,
+  ListItemButton,
+  ListItemText,
 } from '@mui/material';
 import { Edit, Save, Cancel, Delete, ArrowBack } from '@mui/icons-material';
 import { useParams, useNavigate } from 'react-router-dom';
@@ -34,10 +37,12 @@ const BugDetail = () => {
   const [saving, setSaving] = useState(false);
   const [error, setError] = useState('');
   const [editData, setEditData] = useState({});
+  const [similarTasks, setSimilarTasks] = useState([]);
 
   useEffect(() => {
     fetchBug();
     fetchUsers();
+    fetchSimilarTasks();
   }, [id]);
 
   const fetchBug = async () => {
@@ -53,6 +58,16 @@ const BugDetail = () => {
     }
   };
 
+  const fetchSimilarTasks = async () => {
+    try {
+      const response = await tasksAPI.getSimilarTasks(id);
+      setSimilarTasks(response.data);
+    } catch (error) {
+      console.error('Error fetching similar tasks:', error);
+      setSimilarTasks([]);
+    }
+  };
+
   const fetchUsers = async () => {
     try {
       const response = await usersAPI.getUsers();
@@ -419,6 +434,28 @@ const BugDetail = () => {
               </Typography>
             )}
           </Grid>
+
+          {similarTasks.length > 0 && (
+            <Grid size={12}>
+              <Divider sx={{ my: 2 }} />
+              <Typography variant="h6" gutterBottom>
+                Similar Tasks
+              </Typography>
+              <List dense disablePadding>
+                {similarTasks.map(({ task, similarity_score }) => (
+                  <ListItemButton
+                    key={task.id || task._id}
+                    onClick={() => navigate(`/bugs/${task.id || task._id}`)}
+                  >
+                    <ListItemText
+                      primary={task.title}
+                      secondary={`${task.status} · ${task.severity} · ${Math.round(similarity_score * 100)}% match`}
+                    />
+                  </ListItemButton>
+                ))}
+              </List>
+            </Grid>
+          )}
         </Grid>
       </Paper>
     </Container>
@@ -33,6 +33,7 @@ const CreateBug = () => {
   const [error, setError] = useState('');
   const [loading, setLoading] = useState(false);
   const [generatedTags, setGeneratedTags] = useState([]);
+  const [duplicates, setDuplicates] = useState([]);
 
   useEffect(() => {
     fetchUsers();
@@ -54,6 +55,20 @@ const CreateBug = () => {
     });
   };
 
+  const checkDuplicates = async () => {
+    if (!formData.title.trim()) {
+      setDuplicates([]);
+      return;
+    }
+
+    try {
+      const response = await tasksAPI.findDuplicates(formData.title, formData.description);
+      setDuplicates(response.data);
+    } catch (error) {
+      console.error('Error checking for duplicates:', error);
+    }
+  };
+
   const handleDescriptionChange = (content) => {
     setFormData({
       ...formData,
@@ -149,10 +164,27 @@ const CreateBug = () => {
             name="title"
             value={formData.title}
             onChange={handleChange}
+            onBlur={checkDuplicates}
             margin="normal"
             placeholder="Brief description of the task"
           />
 
+          {duplicates.length > 0 && (
+            <Alert severity="warning" sx={{ mt: 1 }}>
+              <Typography variant="body2">
+                Possible duplicates of existing tasks:
+              </Typography>
+              {duplicates.map(({ task, similarity_score }) => (
+                <Typography key={task.id || task._id} variant="body2">
+                  <a href={`/bugs/${task.id || task._id}`} target="_blank" rel="noreferrer">
+                    {task.title}
+                  </a>{' '}
+                  ({Math.round(similarity_score * 100)}% match, {task.status})
+                </Typography>
+              ))}
+            </Alert>
+          )}
+
           <RichTextEditor
             value={formData.description}
             onChange={handleDescriptionChange}
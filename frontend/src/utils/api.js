@@ -69,9 +69,52 @@ export const tasksAPI = {
   updateTask: (id, taskData) => api.put(`/tasks/${id}`, taskData),
   deleteTask: (id) => api.delete(`/tasks/${id}`),
   getStats: () => api.get('/tasks/stats'),
+  getTagFacets: (limit = 50) => api.get('/tasks/tags/facets', { params: { limit } }),
   generateDescription: (title) => api.post('/tasks/generate-description', { title }),
   generateTags: (title, description = '') => api.post('/tasks/generate-tags', { title, description }),
   searchTasks: (params = {}) => api.get('/tasks/search', { params }),
+  getSimilarTasks: (id, limit = 5) => api.get(`/tasks/${id}/similar`, { params: { limit } }),
+  findDuplicates: (title, description = '') => api.post('/tasks/duplicates', { title, description }),
+};
+
+// Streaming search: calls onEvent(stage, data) for each Server-Sent Event.
+// Uses fetch rather than EventSource so the Authorization header can be sent.
+export const streamSearchTasks = async (params, onEvent, signal) => {
+  const token = localStorage.getItem('token');
+  const query = new URLSearchParams(
+    Object.entries(params).filter(([, value]) => value !== undefined && value !== null && value !== '')
+  );
+  const response = await fetch(`${API_BASE_URL}/tasks/search/stream?${query}`, {
+    headers: token ? { Authorization: `Bearer ${token}` } : {},
+    signal,
+  });
+
+  if (!response.ok) {
+    throw new Error(`Search failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    const events = buffer.split('\n\n');
+    buffer = events.pop();
+
+    for (const rawEvent of events) {
+      let stage = 'message';
+      let data = '';
+      for (const line of rawEvent.split('\n')) {
+        if (line.startsWith('event: ')) stage = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (data) onEvent(stage, JSON.parse(data));
+    }
+  }
 };
 
 // Users API